@@ -1,6 +1,5 @@
 import asyncio
 import base64
-import hashlib
 import json
 import os
 import secrets
@@ -51,12 +50,14 @@ from xiaomusic import __version__
 from xiaomusic.utils import (
     check_bili_fav_list,
     chmoddir,
+    close_http_session,
     convert_file_to_mp3,
     deepcopy_data_no_sensitive_info,
     download_one_music,
     download_playlist,
     downloadfile,
     get_latest_version,
+    hash_access_code,
     is_mp3,
     remove_common_prefix,
     remove_id3_tags,
@@ -93,6 +94,9 @@ async def app_lifespan(app):
         yield
     except Exception as e:
         log.exception(f"Execption {e}")
+    finally:
+        # 關閉 utils 模塊的共享 aiohttp 會話
+        await close_http_session()
 
 
 security = HTTPBasic()
@@ -1100,15 +1104,9 @@ def access_key_verification(file_path, key, code):
 
     if code is not None:
         current_code_bytes = code.encode("utf8")
-        correct_code_bytes = (
-            hashlib.sha256(
-                (
-                    file_path + config.httpauth_username + config.httpauth_password
-                ).encode("utf-8")
-            )
-            .hexdigest()
-            .encode("utf-8")
-        )
+        correct_code_bytes = hash_access_code(
+            file_path, config.httpauth_username, config.httpauth_password
+        ).encode("utf-8")
         is_correct_code = secrets.compare_digest(correct_code_bytes, current_code_bytes)
         if is_correct_code:
             return True
@@ -1203,8 +1201,8 @@ async def openapi(Verifcation=Depends(verification)):
 @app.get("/proxy", summary="基于正常下载逻辑的代理接口")
 async def proxy(urlb64: str):
     try:
-        # 将Base64编码的URL解码为字符串
-        url_bytes = base64.b64decode(urlb64)
+        # 将Base64编码的URL解码为字符串（兼容标准和 urlsafe 两种字母表）
+        url_bytes = base64.b64decode(urlb64.replace("-", "+").replace("_", "/"))
         url = url_bytes.decode("utf-8")
         print(f"解码后的代理请求: {url}")
     except Exception as e:
@@ -37,6 +37,8 @@ class JSPluginManager:
         self._lock = threading.Lock()
         self.request_id = 0
         self.pending_requests = {}
+        # 插件配置解析結果緩存 (mtime, data)，搜索高峰期不用每次重讀文件
+        self._config_cache = (None, None)
 
         # 啟動 Node.js 子進程
         self._start_node_process()
@@ -217,6 +219,23 @@ class JSPluginManager:
 
     """------------------------------开放接口相关函数----------------------------------------"""
 
+    def _read_plugins_config(self) -> dict[str, Any] | None:
+        """讀取並解析插件配置文件，按 mtime 緩存
+        配置文件被改寫（包括本進程自己寫入）後 mtime 變化，緩存自動失效；
+        文件不存在時返回 None
+        """
+        try:
+            mtime = os.path.getmtime(self.plugins_config_path)
+        except OSError:
+            return None
+        cached_mtime, cached_data = self._config_cache
+        if mtime == cached_mtime:
+            return cached_data
+        with open(self.plugins_config_path, encoding="utf-8") as f:
+            config_data = json.load(f)
+        self._config_cache = (mtime, config_data)
+        return config_data
+
     def get_openapi_info(self) -> dict[str, Any]:
         """獲取開放接口配置信息
         Returns:
@@ -224,11 +243,10 @@ class JSPluginManager:
         """
         try:
             # 讀取配置文件中的 OpenAPI 配置信息
-            if os.path.exists(self.plugins_config_path):
-                with open(self.plugins_config_path, encoding="utf-8") as f:
-                    config_data = json.load(f)
-                # 返回 openapi_info 配置项
-                return config_data.get("openapi_info", {})
+            config_data = self._read_plugins_config()
+            if config_data is not None:
+                # 返回 openapi_info 配置项（拷貝，防止調用方改動污染緩存）
+                return dict(config_data.get("openapi_info", {}))
             else:
                 return {"enabled": False}
         except Exception as e:
@@ -439,10 +457,9 @@ class JSPluginManager:
         """獲取啟用的插件列表"""
         try:
             # 讀取配置文件中的啟用插件列表
-            if os.path.exists(self.plugins_config_path):
-                with open(self.plugins_config_path, encoding="utf-8") as f:
-                    config_data = json.load(f)
-                return config_data.get("enabled_plugins", [])
+            config_data = self._read_plugins_config()
+            if config_data is not None:
+                return list(config_data.get("enabled_plugins", []))
             else:
                 return []
         except Exception as e:
@@ -23,9 +23,9 @@ import urllib.parse
 from collections import OrderedDict
 from collections.abc import AsyncIterator
 from dataclasses import asdict, dataclass
+from functools import lru_cache
 from http.cookies import SimpleCookie
 from pathlib import Path
-from time import sleep
 from urllib.parse import parse_qs, urlparse
 
 import aiohttp
@@ -55,6 +55,14 @@ from opencc import OpenCC
 from PIL import Image
 from requests.utils import cookiejar_from_dict
 
+try:
+    # 可選依賴：C++ 實現的模糊匹配，比 difflib 快一兩個量級
+    from rapidfuzz import fuzz as rf_fuzz
+    from rapidfuzz import process as rf_process
+except ImportError:
+    rf_fuzz = None
+    rf_process = None
+
 from xiaomusic.const import SUPPORT_MUSIC_TYPE
 
 log = logging.getLogger(__package__)
@@ -62,6 +70,30 @@ log = logging.getLogger(__package__)
 cc = OpenCC("t2s")  # convert from Traditional Chinese to Simplified Chinese
 
 
+# 模塊級共享的 aiohttp 會話，懶創建
+# 復用連接池和 DNS 緩存，避免每次請求都重新建立 TCP+TLS 連接
+_http_session: aiohttp.ClientSession | None = None
+
+
+def get_http_session() -> aiohttp.ClientSession:
+    """獲取共享的 aiohttp 會話（不存在或已關閉時重新創建）"""
+    global _http_session
+    if _http_session is None or _http_session.closed:
+        _http_session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=20, ttl_dns_cache=300),
+            timeout=aiohttp.ClientTimeout(total=10),
+        )
+    return _http_session
+
+
+async def close_http_session():
+    """關閉共享會話，應用退出時調用"""
+    global _http_session
+    if _http_session is not None and not _http_session.closed:
+        await _http_session.close()
+    _http_session = None
+
+
 ### HELP FUNCTION ###
 ### HELP FUNCTION ###
 def parse_cookie_string(cookie_string):
@@ -74,7 +106,10 @@ def parse_cookie_string(cookie_string):
     return cookiejar_from_dict(cookies_dict, cookiejar=None, overwrite=True)
 
 
-_no_elapse_chars = re.compile(r"([「」『』《》“”'\"()（）]|(?<!-)-(?!-))", re.UNICODE)
+# 不發音的引號和括號，用 translate 表在 C 層一次刪除
+_no_elapse_table = str.maketrans("", "", "「」『』《》“”'\"()（）")
+# 單獨的連字符（前後都不是連字符時）仍需正則處理
+_single_dash = re.compile(r"(?<!-)-(?!-)")
 
 
 def calculate_tts_elapse(text: str) -> float:
@@ -86,7 +121,10 @@ def calculate_tts_elapse(text: str) -> float:
     # for simplicity, we use a fixed speed
     speed = 4.5  # this value is picked by trial and error
     # Exclude quotes and brackets that do not affect the total elapsed time
-    return len(_no_elapse_chars.sub("", text)) / speed
+    text = text.translate(_no_elapse_table)
+    if "-" in text:
+        text = _single_dash.sub("", text)
+    return len(text) / speed
 
 
 _ending_punctuations = ("。", "？", "！", "；", ".", "?", "!", ";")
@@ -133,6 +171,12 @@ def validate_proxy(proxy_str: str) -> bool:
     return True
 
 
+# 增量搜索緩存：記錄上一次的搜索詞和結果
+# 搜索詞是上一次的超集時（用戶連續輸入），直接在上一次的結果裡過濾
+_last_query = ""
+_last_result = []
+
+
 # 模糊搜索入口函數
 def fuzzyfinder(user_input, collection, extra_search_index=None):
     """
@@ -141,9 +185,28 @@ def fuzzyfinder(user_input, collection, extra_search_index=None):
     :param collection: 被搜索的集合 (通常是歌曲列表)
     :param extra_search_index: 額外的搜索索引
     """
-    return find_best_match(
-        user_input, collection, cutoff=0.1, n=10, extra_search_index=extra_search_index
+    global _last_query, _last_result
+    candidates = collection
+    if (
+        len(_last_query) >= 2
+        and user_input != _last_query
+        and user_input.startswith(_last_query)
+        and _last_result
+    ):
+        # 輸入是上一次搜索詞的延長，匹配項必然在上一次結果中；
+        # 但候選集可能已經換了（按查詢建的索引、曲庫重掃），
+        # 先和當前集合求交集，免得吐出已經不存在的歌名
+        current = set(collection)
+        narrowed = [name for name in _last_result if name in current]
+        if narrowed:
+            candidates = narrowed
+            extra_search_index = None
+    result = find_best_match(
+        user_input, candidates, cutoff=0.1, n=10, extra_search_index=extra_search_index
     )
+    _last_query = user_input
+    _last_result = result
+    return result
 
 
 def traditional_to_simple(to_convert: str):
@@ -151,6 +214,13 @@ def traditional_to_simple(to_convert: str):
     return cc.convert(to_convert)
 
 
+@lru_cache(maxsize=8192)
+def _normalize_for_match(text: str) -> str:
+    """小寫 + 繁轉簡。歌名集合在兩次查詢之間基本不變，
+    按原字符串緩存轉換結果，免得每條語音指令都全量跑一遍 OpenCC"""
+    return cc.convert(text.lower())
+
+
 # 關鍵詞檢測與排序
 def keyword_detection(user_input, str_list, n):
     """
@@ -167,11 +237,14 @@ def keyword_detection(user_input, str_list, n):
         else:
             remains.append(item)
 
-    matched = sorted(
-        matched,
-        key=lambda s: difflib.SequenceMatcher(None, s, user_input).ratio(),
-        reverse=True,  # 降序排序，越相似的越靠前
-    )
+    if rf_fuzz is not None:
+        matched.sort(key=lambda s: rf_fuzz.ratio(s, user_input), reverse=True)
+    else:
+        matched = sorted(
+            matched,
+            key=lambda s: difflib.SequenceMatcher(None, s, user_input).ratio(),
+            reverse=True,  # 降序排序，越相似的越靠前
+        )
 
     # 如果 n 是 -1，如果 n 大於匹配的數量，返回所有匹配的結果
     if n == -1 or n > len(matched):
@@ -189,7 +262,19 @@ def real_search(prompt, candidates, cutoff, n):
     matches, remains = keyword_detection(prompt, candidates, n=n)
     if len(matches) < n:
         # 如果没有准确关键词匹配，开始模糊匹配
-        matches += difflib.get_close_matches(prompt, remains, n=n, cutoff=cutoff)
+        if rf_process is not None:
+            matches += [
+                m
+                for m, _, _ in rf_process.extract(
+                    prompt,
+                    remains,
+                    scorer=rf_fuzz.ratio,
+                    limit=n,
+                    score_cutoff=cutoff * 100,
+                )
+            ]
+        else:
+            matches += difflib.get_close_matches(prompt, remains, n=n, cutoff=cutoff)
     return matches
 
 
@@ -200,10 +285,8 @@ def find_best_match(user_input, collection, cutoff=0.6, n=1, extra_search_index=
     2. 先在主集合搜索
     3. 若結果不足 n 個，且提供了 extra_search_index，則繼續搜索
     """
-    lower_collection = {
-        traditional_to_simple(item.lower()): item for item in collection
-    }
-    user_input = traditional_to_simple(user_input.lower())
+    lower_collection = {_normalize_for_match(item): item for item in collection}
+    user_input = _normalize_for_match(user_input)
     matches = real_search(user_input, lower_collection.keys(), cutoff, n)
     cur_matched_collection = [lower_collection[match] for match in matches]
     if len(matches) >= n or extra_search_index is None:
@@ -211,7 +294,7 @@ def find_best_match(user_input, collection, cutoff=0.6, n=1, extra_search_index=
 
     # 如果數量不滿足，繼續搜索
     lower_extra_search_index = {
-        traditional_to_simple(k.lower()): v
+        _normalize_for_match(k): v
         for k, v in extra_search_index.items()
         if v not in cur_matched_collection
     }
@@ -260,51 +343,52 @@ def _get_depth_path(root, directory, depth):
         return root
 
 
-def _append_files_result(result, root, joinpath, files, support_extension):
-    """
-    將掃描到的合法音樂文件添加到結果字典中
-    :param result: 存儲結果的字典
-    :param root: 作為 key 的目錄名
-    :param joinpath: 文件拼接的根路徑
-    :param files: 文件列表
-    :param support_extension: 支持的文件後綴列表
-    """
-    dir_name = os.path.basename(root)
-    if dir_name not in result:
-        result[dir_name] = []
-    for file in files:
-        # 過濾隱藏文件
-        if file.startswith("."):
-            continue
-        # 過濾文件後綴
-        (name, extension) = os.path.splitext(file)
-        if extension.lower() not in support_extension:
-            continue
-
-        result[dir_name].append(os.path.join(joinpath, file))
-
-
-def traverse_music_directory(directory, depth, exclude_dirs, support_extension):
+def traverse_music_directory(
+    directory, depth, exclude_dirs, support_extension, mtimes=None
+):
     """
     遍歷音樂目錄
     :param directory: 根目錄路徑
     :param depth: 掃描最大深度
     :param exclude_dirs: 忽略的目錄列表
     :param support_extension: 支持的音樂格式後綴
+    :param mtimes: 可選字典，傳入時填充 {文件路徑: mtime}，
+                   直接取 scandir 緩存的 stat，調用方免去二次 stat
     :return: {目錄名: [文件路徑1, 文件路徑2...]}
     """
     result = {}
-    for root, dirs, files in os.walk(directory, followlinks=True):
-        # 忽略排除的目錄
-        dirs[:] = [d for d in dirs if d not in exclude_dirs]
-
+    support_extension = tuple(support_extension)
+    stack = [directory]
+    while stack:
+        root = stack.pop()
         # 計算當前目錄的深度
         current_depth = root[len(directory) :].count(os.sep) + 1
         if current_depth > depth:
-            depth_path = _get_depth_path(root, directory, depth - 1)
-            _append_files_result(result, depth_path, root, files, support_extension)
+            key_root = _get_depth_path(root, directory, depth - 1)
         else:
-            _append_files_result(result, root, root, files, support_extension)
+            key_root = root
+        dir_name = os.path.basename(key_root)
+        bucket = result.setdefault(dir_name, [])
+        try:
+            with os.scandir(root) as it:
+                for entry in it:
+                    name = entry.name
+                    # is_dir/is_file 來自目錄讀取緩存，不觸發額外 stat
+                    if entry.is_dir(follow_symlinks=True):
+                        # 忽略排除的目錄
+                        if name not in exclude_dirs:
+                            stack.append(entry.path)
+                    elif not name.startswith(".") and name.lower().endswith(
+                        support_extension
+                    ):
+                        bucket.append(entry.path)
+                        if mtimes is not None:
+                            try:
+                                mtimes[entry.path] = entry.stat().st_mtime
+                            except OSError:
+                                mtimes[entry.path] = 0.0
+        except OSError as e:
+            log.warning(f"traverse_music_directory 無法讀取目錄: {root} {e}")
     return result
 
 
@@ -536,9 +620,12 @@ def get_duration_by_ffprobe(file_path, ffmpeg_location):
     return duration
 
 
+_ALPHABET = string.ascii_letters + string.digits
+
+
 def get_random(length):
     """生成指定長度的隨機字母數字字符串"""
-    return "".join(random.sample(string.ascii_letters + string.digits, length))
+    return "".join(random.choices(_ALPHABET, k=length))
 
 
 # 深拷贝把敏感数据设置为*
@@ -555,19 +642,18 @@ def deepcopy_data_no_sensitive_info(data, fields_to_anonymize=None):
             "httpauth_password",
         ]
 
-    copy_data = copy.deepcopy(data)
-
-    # 檢查copy_data是否是字典或具有屬性的對象
-    if isinstance(copy_data, dict):
+    # 結果只用於日誌展示，頂層淺拷貝後替換敏感字段即可，
+    # 不必對整棵對象樹做 deepcopy
+    if isinstance(data, dict):
         # 對字典進行處理
-        for field in fields_to_anonymize:
-            if field in copy_data:
-                copy_data[field] = "******"
-    else:
-        # 對對象進行處理
-        for field in fields_to_anonymize:
-            if hasattr(copy_data, field):
-                setattr(copy_data, field, "******")
+        fields = set(fields_to_anonymize)
+        return {k: ("******" if k in fields else v) for k, v in data.items()}
+
+    # 對對象進行處理
+    copy_data = copy.copy(data)
+    for field in fields_to_anonymize:
+        if hasattr(copy_data, field):
+            setattr(copy_data, field, "******")
 
     return copy_data
 
@@ -720,10 +806,13 @@ chinese_to_arabic = {
 }
 
 
+@lru_cache(maxsize=256)
 def chinese_to_number(chinese):
     """
     將中文數字字符串轉換為阿拉伯數字
     例如： "一千二百三十四" -> 1234
+
+    語音指令裡的數字詞反覆出現，結果做 lru_cache 記憶
     """
     result = 0
     unit = 1
@@ -735,9 +824,10 @@ def chinese_to_number(chinese):
     # 如果只有一個字符且是單位，直接返回其值
     if len(chinese) == 1 and chinese_to_arabic[chinese] >= 10:
         return chinese_to_arabic[chinese]
+    get_val = chinese_to_arabic.get
     for char in reversed(chinese):
-        if char in chinese_to_arabic:
-            val = chinese_to_arabic[char]
+        val = get_val(char)
+        if val is not None:
             if val >= 10:
                 if val > unit:
                     unit = val
@@ -761,6 +851,21 @@ def list2str(li, verbose=False):
         return f"{li}"
 
 
+class LazyList2Str:
+    """包一層 list2str，配合 %s 風格日誌用
+    日誌級別不輸出時不會真的拼接字符串，verbose 大列表時省一次大 join
+    """
+
+    __slots__ = ("li", "verbose")
+
+    def __init__(self, li, verbose=False):
+        self.li = li
+        self.verbose = verbose
+
+    def __str__(self):
+        return list2str(self.li, self.verbose)
+
+
 async def get_latest_version(package_name: str) -> str:
     """
     從 PyPI 檢查指定包的最新版本號
@@ -780,12 +885,13 @@ class Metadata:
     """
     音樂元數據數據類
     """
-    title: str = ""   # 標題
+
+    title: str = ""  # 標題
     artist: str = ""  # 藝術家
-    album: str = ""   # 專輯
-    year: str = ""    # 年份
-    genre: str = ""   # 流派
-    picture: str = "" # 封面圖片路徑
+    album: str = ""  # 專輯
+    year: str = ""  # 年份
+    genre: str = ""  # 流派
+    picture: str = ""  # 封面圖片路徑
     lyrics: str = ""  # 歌詞
 
     def __init__(self, info=None):
@@ -854,7 +960,8 @@ def _save_picture(picture_data, save_root, file_path):
     """
     保存二進制圖片數據
     會根據 file_path 的哈希值創建子目錄，避免單個目錄文件過多
-    並調用 _resize_save_image 進行縮放保存
+    按圖片內容哈希去重：同一專輯多首歌共用封面時只縮放保存一份，
+    其餘歌曲通過硬鏈接（或軟鏈接）指向同一份文件
     """
     # 計算文件名的哈希值
     file_hash = hashlib.md5(file_path.encode("utf-8")).hexdigest()
@@ -867,6 +974,26 @@ def _save_picture(picture_data, save_root, file_path):
     (name, _) = os.path.splitext(filename)
     picture_path = os.path.join(dir_path, f"{name}.jpg")
 
+    # 按圖片內容計算哈希，相同封面只縮放保存一次
+    content_hash = hashlib.blake2b(picture_data, digest_size=16).hexdigest()
+    covers_dir = os.path.join(save_root, "covers")
+    canonical_path = os.path.join(covers_dir, f"{content_hash}.jpg")
+    try:
+        os.makedirs(covers_dir, exist_ok=True)
+        if not os.path.exists(canonical_path):
+            _resize_save_image(picture_data, canonical_path)
+        if os.path.exists(canonical_path):
+            if os.path.exists(picture_path):
+                os.remove(picture_path)
+            try:
+                os.link(canonical_path, picture_path)
+            except OSError:
+                os.symlink(canonical_path, picture_path)
+            return picture_path
+    except Exception as e:
+        log.warning(f"Error dedup picture: {e}")
+
+    # 去重失敗時回退到每首歌單獨保存
     try:
         _resize_save_image(picture_data, picture_path)
     except Exception as e:
@@ -1004,6 +1131,21 @@ def extract_audio_metadata(file_path, save_root):
     return asdict(metadata)
 
 
+def extract_audio_metadata_batch(file_paths, save_root):
+    """
+    批量提取音頻元數據，供進程池一次調用處理一批文件
+    返回與輸入等長的列表，解析失敗的位置為 None
+    """
+    results = []
+    for file_path in file_paths:
+        try:
+            results.append(extract_audio_metadata(file_path, save_root))
+        except Exception as e:
+            log.exception(f"extract_audio_metadata failed: {file_path} {e}")
+            results.append(None)
+    return results
+
+
 def set_music_tag_to_file(file_path, info):
     audio = mutagen.File(file_path, easy=True)
     if audio is None:
@@ -1035,6 +1177,26 @@ def set_music_tag_to_file(file_path, info):
         return "Error saving tags"
 
 
+@lru_cache(maxsize=64)
+def _read_picture_cached(path, mtime):
+    """讀取封面圖片並緩存（原始字節和 base64 兩種形式）
+
+    批量給同專輯的歌曲打標籤時，封面只需要從磁盤讀取和編碼一次。
+    mtime 作為緩存鍵的一部分，文件更新後自動失效。
+    """
+    with open(path, "rb") as img_file:
+        raw = img_file.read()
+    return raw, base64.b64encode(raw).decode("ascii")
+
+
+def _read_picture(path):
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        mtime = 0
+    return _read_picture_cached(path, mtime)
+
+
 def _set_mp3_tags(audio, info):
     audio.tags = ID3()
     audio["TIT2"] = TIT2(encoding=3, text=info.title)
@@ -1049,63 +1211,72 @@ def _set_mp3_tags(audio, info):
 
     # 添加封面圖片
     if info.picture:
-        with open(info.picture, "rb") as img_file:
-            image_data = img_file.read()
+        image_data, _ = _read_picture(info.picture)
         audio["APIC"] = APIC(
             encoding=3, mime="image/jpeg", type=3, desc="Cover", data=image_data
         )
     audio.save()  # 保存修改
 
 
+# 各格式的標籤鍵到 info 屬性的映射，模塊加載時構建一次
+_vorbis_tag_keys = (
+    ("TITLE", "title"),
+    ("ARTIST", "artist"),
+    ("ALBUM", "album"),
+    ("DATE", "year"),
+    ("GENRE", "genre"),
+)
+
+_mp4_tag_keys = (
+    ("nam", "title"),
+    ("ART", "artist"),
+    ("alb", "album"),
+    ("day", "year"),
+    ("gen", "genre"),
+)
+
+_asf_tag_keys = (
+    ("Title", "title"),
+    ("Author", "artist"),
+    ("WM/AlbumTitle", "album"),
+    ("WM/Year", "year"),
+    ("WM/Genre", "genre"),
+)
+
+
 def _set_flac_tags(audio, info):
-    audio["TITLE"] = info.title
-    audio["ARTIST"] = info.artist
-    audio["ALBUM"] = info.album
-    audio["DATE"] = info.year
-    audio["GENRE"] = info.genre
+    for key, attr in _vorbis_tag_keys:
+        audio[key] = getattr(info, attr)
     if info.lyrics:
         audio["LYRICS"] = info.lyrics
     if info.picture:
-        with open(info.picture, "rb") as img_file:
-            image_data = img_file.read()
+        image_data, _ = _read_picture(info.picture)
         audio.add_picture(image_data)
 
 
 def _set_mp4_tags(audio, info):
-    audio["nam"] = info.title
-    audio["ART"] = info.artist
-    audio["alb"] = info.album
-    audio["day"] = info.year
-    audio["gen"] = info.genre
+    for key, attr in _mp4_tag_keys:
+        audio[key] = getattr(info, attr)
     if info.picture:
-        with open(info.picture, "rb") as img_file:
-            image_data = img_file.read()
+        image_data, _ = _read_picture(info.picture)
         audio["covr"] = [image_data]
 
 
 def _set_ogg_tags(audio, info):
-    audio["TITLE"] = info.title
-    audio["ARTIST"] = info.artist
-    audio["ALBUM"] = info.album
-    audio["DATE"] = info.year
-    audio["GENRE"] = info.genre
+    for key, attr in _vorbis_tag_keys:
+        audio[key] = getattr(info, attr)
     if info.lyrics:
         audio["LYRICS"] = info.lyrics
     if info.picture:
-        with open(info.picture, "rb") as img_file:
-            image_data = img_file.read()
-        audio["metadata_block_picture"] = base64.b64encode(image_data).decode()
+        _, image_b64 = _read_picture(info.picture)
+        audio["metadata_block_picture"] = image_b64
 
 
 def _set_asf_tags(audio, info):
-    audio["Title"] = info.title
-    audio["Author"] = info.artist
-    audio["WM/AlbumTitle"] = info.album
-    audio["WM/Year"] = info.year
-    audio["WM/Genre"] = info.genre
+    for key, attr in _asf_tag_keys:
+        audio[key] = getattr(info, attr)
     if info.picture:
-        with open(info.picture, "rb") as img_file:
-            image_data = img_file.read()
+        image_data, _ = _read_picture(info.picture)
         audio["WM/Picture"] = image_data
 
 
@@ -1144,47 +1315,60 @@ async def check_bili_fav_list(url):
             "Referer": url,
             "Origin": "https://space.bilibili.com",
         }
-        async with aiohttp.ClientSession(headers=headers) as session:
-            if type == "season" or type == "collect":
-                while True:
-                    list_url = f"https://api.bilibili.com/x/polymer/web-space/seasons_archives_list?season_id={lid}&page_size={page_size}&page_num={page_num}"
-                    async with session.get(list_url) as response:
-                        if response.status != 200:
-                            raise Exception(f"Failed to fetch data from {list_url}")
-                        data = await response.json()
-                        archives = data.get("data", {}).get("archives", [])
-                        if not archives:
-                            break
-                        for archive in archives:
-                            bvid = archive.get("bvid", None)
-                            title = archive.get("title", None)
-                            bvid_info[bvid] = title
-
-                        if len(archives) < page_size:
-                            break
-                        page_num += 1
-                        sleep(1)
-            elif type == "create":
-                while True:
-                    list_url = f"https://api.bilibili.com/x/v3/fav/resource/list?media_id={lid}&pn={page_num}&ps={page_size}&order=mtime"
-                    async with session.get(list_url) as response:
-                        if response.status != 200:
-                            raise Exception(f"Failed to fetch data from {list_url}")
-                        data = await response.json()
-                        medias = data.get("data", {}).get("medias", [])
-                        if not medias:
-                            break
-                        for media in medias:
-                            bvid = media.get("bvid", None)
-                            title = media.get("title", None)
-                            bvurl = f"https://www.bilibili.com/video/{bvid}"
-                            bvid_info[bvurl] = title
-
-                        if len(medias) < page_size:
-                            break
-                        page_num += 1
-            else:
-                raise ValueError("當前只支持合集和收藏夾")
+        session = get_http_session()
+        # 限制並發數，避免請求過快被 B 站風控
+        semaphore = asyncio.Semaphore(5)
+
+        async def fetch_page(list_url):
+            async with semaphore:
+                async with session.get(list_url, headers=headers) as response:
+                    if response.status != 200:
+                        raise Exception(f"Failed to fetch data from {list_url}")
+                    # json.loads 直接吃 bytes，省掉 content-type 檢查和解碼
+                    return json.loads(await response.read())
+
+        if type == "season" or type == "collect":
+
+            def page_url(n):
+                return f"https://api.bilibili.com/x/polymer/web-space/seasons_archives_list?season_id={lid}&page_size={page_size}&page_num={n}"
+
+            # 第一頁返回總數後，剩餘頁併發拉取
+            data = await fetch_page(page_url(page_num))
+            total = data.get("data", {}).get("page", {}).get("total", 0)
+            total_pages = max(1, -(-total // page_size))
+            datas = [data]
+            if total_pages > 1:
+                datas += await asyncio.gather(
+                    *[fetch_page(page_url(n)) for n in range(2, total_pages + 1)]
+                )
+            for data in datas:
+                archives = data.get("data", {}).get("archives", [])
+                for archive in archives:
+                    bvid = archive.get("bvid", None)
+                    title = archive.get("title", None)
+                    bvid_info[bvid] = title
+        elif type == "create":
+
+            def page_url(n):
+                return f"https://api.bilibili.com/x/v3/fav/resource/list?media_id={lid}&pn={n}&ps={page_size}&order=mtime"
+
+            data = await fetch_page(page_url(page_num))
+            total = data.get("data", {}).get("info", {}).get("media_count", 0)
+            total_pages = max(1, -(-total // page_size))
+            datas = [data]
+            if total_pages > 1:
+                datas += await asyncio.gather(
+                    *[fetch_page(page_url(n)) for n in range(2, total_pages + 1)]
+                )
+            for data in datas:
+                medias = data.get("data", {}).get("medias", [])
+                for media in medias:
+                    bvid = media.get("bvid", None)
+                    title = media.get("title", None)
+                    bvurl = f"https://www.bilibili.com/video/{bvid}"
+                    bvid_info[bvurl] = title
+        else:
+            raise ValueError("當前只支持合集和收藏夾")
     return bvid_info
 
 
@@ -1205,6 +1389,9 @@ async def download_playlist(config, url, dirname):
         title,
         "--ffmpeg-location",
         f"{config.ffmpeg_location}",
+        # 進度條沒人看，刷屏還白耗終端寫入
+        "--quiet",
+        "--no-progress",
     )
 
     if config.proxy:
@@ -1218,9 +1405,13 @@ async def download_playlist(config, url, dirname):
 
     sbp_args += (url,)
 
-    cmd = " ".join(sbp_args)
-    log.info(f"download_playlist: {cmd}")
-    download_proc = await asyncio.create_subprocess_exec(*sbp_args)
+    # 延遲格式化，日誌級別關閉時不做字符串拼接
+    log.info("download_playlist: %s", sbp_args)
+    download_proc = await asyncio.create_subprocess_exec(
+        *sbp_args,
+        stdout=asyncio.subprocess.DEVNULL,
+        stderr=asyncio.subprocess.DEVNULL,
+    )
     return download_proc
 
 
@@ -1243,6 +1434,8 @@ async def download_one_music(config, url, name=""):
         title,
         "--ffmpeg-location",
         f"{config.ffmpeg_location}",
+        "--quiet",
+        "--no-progress",
     )
 
     if config.proxy:
@@ -1256,9 +1449,12 @@ async def download_one_music(config, url, name=""):
 
     sbp_args += (url,)
 
-    cmd = " ".join(sbp_args)
-    log.info(f"download_one_music: {cmd}")
-    download_proc = await asyncio.create_subprocess_exec(*sbp_args)
+    log.info("download_one_music: %s", sbp_args)
+    download_proc = await asyncio.create_subprocess_exec(
+        *sbp_args,
+        stdout=asyncio.subprocess.DEVNULL,
+        stderr=asyncio.subprocess.DEVNULL,
+    )
     return download_proc
 
 
@@ -1266,39 +1462,40 @@ def _longest_common_prefix(file_names):
     if not file_names:
         return ""
 
-    # 將第一個文件名作為初始前綴
-    prefix = file_names[0]
+    # 只需比較字典序最小和最大的兩個名字
+    return os.path.commonprefix([min(file_names), max(file_names)])
 
-    for file_name in file_names[1:]:
-        while not file_name.startswith(prefix):
-            # 如果當前文件名不以prefix開頭，則縮短prefix
-            prefix = prefix[:-1]
-            if not prefix:
-                return ""
 
-    return prefix
+@lru_cache(maxsize=8)
+def _normpath_cached(path):
+    return os.path.normpath(path)
 
 
 def safe_join_path(safe_root, directory):
-    directory = os.path.join(safe_root, directory)
-    # Normalize the directory path
-    normalized_directory = os.path.normpath(directory)
-    # Ensure the directory is within the safe root
-    if not normalized_directory.startswith(os.path.normpath(safe_root)):
+    root = _normpath_cached(safe_root)
+    normalized_directory = os.path.normpath(os.path.join(root, directory))
+    # commonpath 按路徑段比較，避免 startswith 把 /safeother 誤判為 /safe 之內
+    if os.path.commonpath((root, normalized_directory)) != root:
         raise ValueError(f"Access to directory '{directory}' is not allowed.")
     return normalized_directory
 
 
+# 去掉前綴後重新編號的文件名模式
+_remove_prefix_pattern = re.compile(r"^[pP]?(\d+)\s+\d*(.+?)\.(.*$)")
+
+
 # 移除目錄下文件名前綴相同的
 def remove_common_prefix(directory):
-    files = os.listdir(directory)
+    # 只處理文件，scandir 可以避免逐個 stat
+    with os.scandir(directory) as it:
+        files = [entry.name for entry in it if entry.is_file()]
 
     # 獲取所有文件的前綴
     common_prefix = _longest_common_prefix(files)
 
     log.info(f'Common prefix identified: "{common_prefix}"')
 
-    pattern = re.compile(r"^[pP]?(\d+)\s+\d*(.+?)\.(.*$)")
+    pattern = _remove_prefix_pattern
     for filename in files:
         if filename == common_prefix:
             continue
@@ -1321,19 +1518,36 @@ def remove_common_prefix(directory):
             log.debug(f'Renamed: "{filename}" to "{new_filename}"')
 
 
+@lru_cache(maxsize=1024)
+def hash_access_code(file_path, username, password):
+    """計算訪問控制參數 code 的摘要（帶緩存）
+
+    同一個文件的 code 在憑證不變時是固定的，緩存後重複請求不再反覆哈希。
+    注意算法需要和前端/驗證端保持一致，不能單獨修改。
+    """
+    return hashlib.sha256((file_path + username + password).encode("utf-8")).hexdigest()
+
+
+@lru_cache(maxsize=4096)
+def _unquote_cached(path):
+    return urllib.parse.unquote(path)
+
+
 def try_add_access_control_param(config, url):
     if config.disable_httpauth:
         return url
 
     url_parts = urllib.parse.urlparse(url)
-    file_path = urllib.parse.unquote(url_parts.path)
-    correct_code = hashlib.sha256(
-        (file_path + config.httpauth_username + config.httpauth_password).encode(
-            "utf-8"
-        )
-    ).hexdigest()
+    file_path = _unquote_cached(url_parts.path)
+    correct_code = hash_access_code(
+        file_path, config.httpauth_username, config.httpauth_password
+    )
     log.debug(f"rewrite url: [{file_path}, {correct_code}]")
 
+    # 本地音樂鏈接通常沒有查詢參數，直接拼接省掉 parse/re-encode 往返
+    if not url_parts.query and not url_parts.fragment:
+        return f"{url}?code={correct_code}"
+
     # make new url
     parsed_get_args = dict(urllib.parse.parse_qsl(url_parts.query))
     parsed_get_args.update({"code": correct_code})
@@ -1351,17 +1565,24 @@ def try_add_access_control_param(config, url):
 
 
 # 判斷文件在不在排除目錄列表
+# ignore_absolute_dirs 傳入 tuple 時可避免每次調用的轉換開銷
 def not_in_dirs(filename, ignore_absolute_dirs):
+    if not ignore_absolute_dirs:
+        return True  # 沒有配置排除目錄
+    if not isinstance(ignore_absolute_dirs, tuple):
+        ignore_absolute_dirs = tuple(ignore_absolute_dirs)
     file_absolute_path = os.path.abspath(filename)
     file_dir = os.path.dirname(file_absolute_path)
-    for ignore_dir in ignore_absolute_dirs:
-        if file_dir.startswith(ignore_dir):
-            log.info(f"{file_dir} in {ignore_dir}")
-            return False  # 文件在排除目錄中
+    # startswith 接受 tuple，一次 C 層調用完成所有前綴比較
+    if file_dir.startswith(ignore_absolute_dirs):
+        log.info(f"{file_dir} in {ignore_absolute_dirs}")
+        return False  # 文件在排除目錄中
 
     return True  # 文件不在排除目錄中
 
 
+# 運行環境在進程生命週期內不會變，首次判斷後緩存
+@lru_cache(maxsize=1)
 def is_docker():
     return os.path.exists("/app/.dockerenv")
 
@@ -1374,8 +1595,7 @@ async def restart_xiaomusic():
         "xiaomusic",
     )
 
-    cmd = " ".join(sbp_args)
-    log.info(f"restart_xiaomusic: {cmd}")
+    log.info("restart_xiaomusic: %s", sbp_args)
     await asyncio.sleep(2)
     proc = await asyncio.create_subprocess_exec(*sbp_args)
     exit_code = await proc.wait()  # 等待子進程完成
@@ -1401,6 +1621,7 @@ async def update_version(version: str, lite: bool = True):
     return await download_and_extract(url, target_directory)
 
 
+@lru_cache(maxsize=1)
 def get_os_architecture():
     """
     獲取操作系統架構類型：amd64、arm64、arm-v7。
@@ -1425,41 +1646,59 @@ async def download_and_extract(url: str, target_directory: str):
     # 創建目標目錄
     os.makedirs(target_directory, exist_ok=True)
 
-    # 使用 aiohttp 異步下載文件
-    async with aiohttp.ClientSession() as session:
-        async with session.get(url) as response:
-            if response.status == 200:
-                file_name = os.path.join(target_directory, url.split("/")[-1])
-                file_name = os.path.normpath(file_name)
-                if not file_name.startswith(target_directory):
-                    log.warning(f"Invalid file path: {file_name}")
-                    return
-                with open(file_name, "wb") as f:
-                    # 以塊的方式下載文件，防止內存佔用過大
-                    async for chunk in response.content.iter_any():
-                        f.write(chunk)
-                log.info(f"文件下載完成: {file_name}")
-
-                # 解压下载的文件
-                if file_name.endswith(".tar.gz"):
-                    await extract_tar_gz(file_name, target_directory)
-                else:
-                    ret = f"下載失敗, 包有問題: {file_name}"
-                log.warning(ret)
-
+    # 使用共享會話異步下載文件（大文件下載單獨放寬超時）
+    session = get_http_session()
+    async with session.get(url, timeout=aiohttp.ClientTimeout(total=600)) as response:
+        if response.status == 200:
+            file_name = os.path.join(target_directory, url.split("/")[-1])
+            file_name = os.path.normpath(file_name)
+            if not file_name.startswith(target_directory):
+                log.warning(f"Invalid file path: {file_name}")
+                return
+            if file_name.endswith(".tar.gz"):
+                # 邊下載邊解壓：把 HTTP 流直接餵給 tar 的標準輸入
+                # 網絡接收、gzip 解壓和磁盤寫入三者重疊進行
+                ret = await _extract_tar_gz_stream(
+                    response, file_name, target_directory
+                )
             else:
-                ret = f"下載失敗, 狀態碼: {response.status}"
+                ret = f"下載失敗, 包有問題: {file_name}"
                 log.warning(ret)
+
+        else:
+            ret = f"下載失敗, 狀態碼: {response.status}"
+            log.warning(ret)
     return ret
 
 
-async def extract_tar_gz(file_name: str, target_directory: str):
-    # 使用 asyncio.create_subprocess_exec 執行 tar 解壓命令
-    command = ["tar", "-xzvf", file_name, "-C", target_directory]
-    # 啟動子進程執行解壓命令
-    await asyncio.create_subprocess_exec(*command)
-    # 不等待子進程完成
-    log.info(f"extract_tar_gz ing {file_name}")
+async def _extract_tar_gz_stream(response, file_name: str, target_directory: str):
+    ret = "OK"
+    tar_proc = await asyncio.create_subprocess_exec(
+        "tar",
+        "-xzf",
+        "-",
+        "-C",
+        target_directory,
+        stdin=asyncio.subprocess.PIPE,
+    )
+    try:
+        # 以大塊的方式下載文件，防止內存佔用過大的同時減少 await 次數
+        async for chunk in response.content.iter_chunked(1024 * 1024):
+            tar_proc.stdin.write(chunk)
+            await tar_proc.stdin.drain()
+        tar_proc.stdin.close()
+        exit_code = await tar_proc.wait()
+        if exit_code != 0:
+            ret = f"解壓失敗, tar 退出碼: {exit_code}"
+            log.warning(ret)
+        else:
+            log.info(f"下載並解壓完成: {file_name}")
+    except Exception as e:
+        tar_proc.kill()
+        await tar_proc.wait()
+        ret = f"下載失敗: {e}"
+        log.warning(ret)
+    return ret
 
 
 def chmodfile(file_path: str):
@@ -1470,50 +1709,48 @@ def chmodfile(file_path: str):
 
 
 def chmoddir(dir_path: str):
-    # 獲取指定目錄下的所有文件和子目錄
-    for item in os.listdir(dir_path):
-        item_path = os.path.join(dir_path, item)
-        # 確保是文件，且不是目錄
-        if os.path.isfile(item_path):
+    # scandir 的 is_file 來自目錄讀取緩存，不用逐個 stat
+    with os.scandir(dir_path) as it:
+        for entry in it:
+            # 確保是文件，且不是目錄
+            if not entry.is_file(follow_symlinks=False):
+                continue
             try:
-                os.chmod(item_path, 0o775)
-                log.info(f"Changed permissions of file: {item_path}")
-            except Exception as e:
+                os.chmod(entry.path, 0o775)
+            except OSError as e:
                 log.info(f"chmoddir failed: {e}")
 
 
-async def fetch_json_get(url, headers, config):
-    connector = None
+async def fetch_json_get(url, headers, config, session=None):
     proxy = None
+    ssl = None
     if config and config.proxy:
-        connector = aiohttp.TCPConnector(
-            ssl=False,  # 如需驗證SSL證書，可改為True（需確保代理支持）
-            limit=10,
-        )
         proxy = config.proxy
+        ssl = False  # 如需驗證SSL證書，可改為True（需確保代理支持）
+    if session is None:
+        session = get_http_session()
     try:
-        # 2. 傳入代理配置創建ClientSession
-        async with aiohttp.ClientSession(connector=connector) as session:
-            # 3. 發起帶代理的GET請求
-            async with session.get(
-                url,
-                headers=headers,
-                proxy=proxy,  # 傳入格式化後的代理參數
-                timeout=10,  # 超時時間（秒），避免無限等待
-            ) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    log.info(f"fetch_json_get: {url} success {data}")
-
-                    # 確保返回結果為dict
-                    if isinstance(data, dict):
-                        return data
-                    else:
-                        log.warning(f"Expected dict, but got {type(data)}: {data}")
-                        return {}
+        # 發起帶代理的GET請求（代理配置按請求傳入，複用共享會話）
+        async with session.get(
+            url,
+            headers=headers,
+            proxy=proxy,  # 傳入格式化後的代理參數
+            ssl=ssl,
+            timeout=aiohttp.ClientTimeout(total=10),  # 超時時間（秒），避免無限等待
+        ) as response:
+            if response.status == 200:
+                data = json.loads(await response.read())
+                log.info(f"fetch_json_get: {url} success {data}")
+
+                # 確保返回結果為dict
+                if isinstance(data, dict):
+                    return data
                 else:
-                    log.error(f"HTTP Error: {response.status} {url}")
+                    log.warning(f"Expected dict, but got {type(data)}: {data}")
                     return {}
+            else:
+                log.error(f"HTTP Error: {response.status} {url}")
+                return {}
     except aiohttp.ClientError as e:
         log.error(f"ClientError fetching {url} (proxy: {proxy}): {e}")
         return {}
@@ -1523,31 +1760,32 @@ async def fetch_json_get(url, headers, config):
     except Exception as e:
         log.error(f"Unexpected error fetching {url} (proxy: {proxy}): {e}")
         return {}
-    finally:
-        # 4. 關閉連接器（避免資源洩漏）
-        if connector and not connector.closed:
-            await connector.close()
 
 
 class LRUCache(OrderedDict):
+    """簡單的 LRU 緩存
+
+    值自帶過期邏輯（見 MusicUrlCache）且需要顯式刪除，
+    所以不能直接换成 functools.lru_cache
+    """
+
     def __init__(self, max_size=1000):
         super().__init__()
         self.max_size = max_size
 
     def __setitem__(self, key, value):
-        if key in self:
-            # 移動到末尾(最近使用)
-            self.move_to_end(key)
         super().__setitem__(key, value)
+        # 移動到末尾(最近使用)
+        self.move_to_end(key)
         # 如果超出大小限制,刪除最早使用的項
         if len(self) > self.max_size:
             self.popitem(last=False)
 
     def __getitem__(self, key):
-        # 訪問時移動到末尾(最近使用)
-        if key in self:
-            self.move_to_end(key)
-        return super().__getitem__(key)
+        # 訪問時移動到末尾(最近使用)，未命中時直接拋 KeyError
+        value = super().__getitem__(key)
+        self.move_to_end(key)
+        return value
 
 
 class MusicUrlCache:
@@ -1576,15 +1814,16 @@ class MusicUrlCache:
 
     def _get_from_cache(self, url: str) -> str:
         """從緩存中獲取URL"""
-        try:
-            cached_url, expire_time = self.cache[url]
-            if time.time() > expire_time:
-                # 緩存過期,刪除
-                del self.cache[url]
-                return ""
-            return cached_url
-        except KeyError:
+        # 用 OrderedDict.get 跳過 LRUCache.__getitem__，未命中時不走異常，
+        # 命中且未過期才 move_to_end；過期條目留待下次 set 時覆蓋
+        entry = OrderedDict.get(self.cache, url)
+        if entry is None:
+            return ""
+        cached_url, expire_time = entry
+        if time.time() > expire_time:
             return ""
+        self.cache.move_to_end(url)
+        return cached_url
 
     async def _fetch_from_api(self, url: str, headers: dict = None, config=None) -> str:
         """從API獲取真實URL"""
@@ -1638,6 +1877,10 @@ class MusicUrlCache:
         return len(self.cache)
 
 
+# 正在生成中的 TTS 任務，同一文本的併發請求只調用一次 edge-tts
+_tts_inflight: dict[str, asyncio.Future] = {}
+
+
 async def text_to_mp3(
     text: str, save_dir: str, voice: str = "zh-CN-XiaoxiaoNeural"
 ) -> str:
@@ -1657,7 +1900,7 @@ async def text_to_mp3(
 
     # 基於文本和語音模型生成唯一文件名（避免相同文本不同語音重複）
     content = f"{text}_{voice}".encode()
-    file_hash = hashlib.md5(content).hexdigest()
+    file_hash = hashlib.blake2b(content, digest_size=16).hexdigest()
     mp3_filename = f"{file_hash}.mp3"
     mp3_path = os.path.join(save_dir, mp3_filename)
 
@@ -1665,12 +1908,28 @@ async def text_to_mp3(
     if os.path.exists(mp3_path):
         return mp3_path
 
+    # 同一文本已經在生成中，等待那個任務完成即可
+    fut = _tts_inflight.get(file_hash)
+    if fut is not None:
+        await fut
+        return mp3_path
+
+    fut = asyncio.get_event_loop().create_future()
+    _tts_inflight[file_hash] = fut
+
     # 調用edge-tts生成語音
     try:
         communicate = edge_tts.Communicate(text, voice)
         await communicate.save(mp3_path)
         log.info(f"語音文件生成成功: {mp3_path}")
     except Exception as e:
-        raise RuntimeError(f"生成語音文件失敗: {e}") from e
+        exc = RuntimeError(f"生成語音文件失敗: {e}")
+        fut.set_exception(exc)
+        fut.exception()  # 標記已取回，避免無等待者時的 asyncio 告警
+        raise exc from e
+    else:
+        fut.set_result(mp3_path)
+    finally:
+        _tts_inflight.pop(file_hash, None)
 
     return mp3_path
@@ -1,5 +1,6 @@
 #!/usr/bin/env python3
 import asyncio
+import atexit
 import base64
 import copy
 import ipaddress
@@ -7,16 +8,25 @@ import json
 import logging
 import math
 import os
+import queue
 import random
 import re
 import socket
 import time
 import urllib.parse
-from collections import OrderedDict
+from collections import Counter, OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import asdict
-from logging.handlers import RotatingFileHandler
+from functools import cache, lru_cache
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 
-from aiohttp import ClientSession, ClientTimeout
+try:
+    # 可選依賴：tag cache 很大時 orjson 的 C 實現解析/序列化快一個量級
+    import orjson
+except ImportError:
+    orjson = None
+
+from aiohttp import ClientSession, ClientTimeout, TCPConnector
 from miservice import MiAccount, MiIOService, MiNAService, miio_command
 from watchdog.events import (
     FileCreatedEvent,
@@ -49,6 +59,7 @@ from xiaomusic.const import (
 from xiaomusic.crontab import Crontab
 from xiaomusic.plugin import PluginManager
 from xiaomusic.utils import (
+    LazyList2Str,
     Metadata,
     MusicUrlCache,
     chinese_to_number,
@@ -56,12 +67,11 @@ from xiaomusic.utils import (
     custom_sort_key,
     deepcopy_data_no_sensitive_info,
     downloadfile,
-    extract_audio_metadata,
+    extract_audio_metadata_batch,
     find_best_match,
     fuzzyfinder,
     get_local_music_duration,
     get_web_music_duration,
-    list2str,
     not_in_dirs,
     parse_cookie_string,
     parse_str_to_dict,
@@ -73,6 +83,104 @@ from xiaomusic.utils import (
 )
 
 
+# 同一首網絡歌曲會被反覆解析，緩存 base64 編碼結果；
+# urlsafe 字母表避免 +/= 之外的 + 和 / 出現在查詢串裡被誤解析
+@lru_cache(maxsize=1024)
+def _gen_proxy_url(url_prefix, origin_url):
+    urlb64 = base64.urlsafe_b64encode(origin_url.encode("utf-8")).decode("ascii")
+    return "".join((url_prefix, "/proxy?urlb64=", urlb64))
+
+
+def _json_loads(buf):
+    if orjson is not None:
+        return orjson.loads(buf)
+    return json.loads(buf)
+
+
+# tag cache 的讀寫，優先走 orjson
+def _load_json_file(filename):
+    if orjson is not None:
+        with open(filename, "rb") as f:
+            return orjson.loads(f.read())
+    with open(filename, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _dump_json_file(filename, data):
+    # 先寫臨時文件再原子替換，寫到一半崩潰不會留下壞文件
+    tmp_filename = f"{filename}.tmp"
+    if orjson is not None:
+        with open(tmp_filename, "wb") as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+    else:
+        with open(tmp_filename, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_filename, filename)
+
+
+# 同一首歌會出現在多個歌單（全部、所有歌曲、目錄歌單）裡，
+# 緩存排序鍵避免每個歌單都重跑一遍正則解析；曲庫更新時清空
+@cache
+def _cached_sort_key(name):
+    return custom_sort_key(name)
+
+
+# 「N個歌單名」語音指令的參數格式，模塊級編譯一次
+_PLAY_INDEX_RE = re.compile(r"^([零一二三四五六七八九十百千万亿]+)个(.*)")
+
+
+# get_music 的方向分發表，每次切歌查一次表代替逐個字符串比較；
+# 返回 None 表示順序播放到了結尾
+_NEXT_INDEX_FNS = {
+    "next": lambda i, n, seq_end: None if seq_end and i + 1 >= n else (i + 1) % n,
+    "prev": lambda i, n, seq_end: (i - 1) % n,
+}
+
+
+# SSRF 檢查的 DNS 結果按主機名緩存一段時間，
+# 同一接口被連續點播時不用每次都重新解析域名
+_safe_hostname_cache = {}  # hostname -> (過期時間戳, 是否安全)
+_SAFE_HOSTNAME_TTL = 300
+
+
+async def _is_safe_hostname(hostname) -> bool:
+    """檢查主機解析到的IP是否安全，防止訪問內網/本地地址"""
+    if not hostname:
+        return False
+    now = time.monotonic()
+    cached = _safe_hostname_cache.get(hostname)
+    if cached is not None and cached[0] > now:
+        return cached[1]
+    try:
+        # loop.getaddrinfo 在默認線程池裡解析，不會卡住事件循環
+        addrinfo_list = await asyncio.get_running_loop().getaddrinfo(hostname, None)
+    except Exception:
+        # 解析失敗可能是瞬時的，不緩存
+        return False
+    safe = True
+    for family, _, _, _, sockaddr in addrinfo_list:
+        ip_str = sockaddr[0] if family in (socket.AF_INET, socket.AF_INET6) else None
+        if not ip_str:
+            continue
+        try:
+            ip_obj = ipaddress.ip_address(ip_str)
+        except ValueError:
+            safe = False
+            break
+        # 拒绝内网、回环、链路本地、多播和保留地址
+        if (
+            ip_obj.is_private
+            or ip_obj.is_loopback
+            or ip_obj.is_link_local
+            or ip_obj.is_multicast
+            or ip_obj.is_reserved
+        ):
+            safe = False
+            break
+    _safe_hostname_cache[hostname] = (now + _SAFE_HOSTNAME_TTL, safe)
+    return safe
+
+
 class XiaoMusic:
     """
     XiaoMusic 核心類
@@ -105,20 +213,42 @@ class XiaoMusic:
         self.all_music = {}  # 所有音樂索引 {name: path/url}
         self._all_radio = {}  # 電台列表
         self._web_music_api = {}  # 需要通過 API 獲取播放鏈接的列表
+        self._web_music_names = frozenset()  # 網絡歌曲名集合，隨歌單重建
+        self._existing_files = frozenset()  # 掃描時確認存在的本地文件
+        self._stat_hits = set()  # 掃描後用 stat 確認過存在的文件，重掃時清空
         self.music_list = {}  # 播放列表 key 為目錄名, value 為 play_list
         self.default_music_list_names = []  # 非自定義歌單 (如默認目錄)
         self.devices = {}  # 設備對象字典 key 為 did
+        self._device_configs = {}  # 上次 update_devices 時的設備配置快照
         self._cur_did = None  # 當前操作的設備 did
         self.running_task = []  # 當前正在運行的異步任務列表
         self.all_music_tags = {}  # 歌曲額外信息 (元數據、標籤)
+        self._tag_sigs = {}  # 歌名 -> 解析 tag 時的文件 mtime，變了才重新解析
+        self._tag_cache_dirty = False  # tag cache 有改動等待落盤
+        self._config_save_dirty = False  # 配置有改動等待落盤
+        self._file_mtimes = {}  # 文件路徑 -> 掃描時的 mtime
+        self._empty_tag = asdict(Metadata())  # 空標籤模板，取用時 copy
         self._tag_generation_task = False  # 標記是否正在生成標籤
+        self._main_loop = None  # run_forever 時的主事件循環
+        self._rescan_pending = False  # 文件變化觸發的重掃是否已排隊
+        self._rescan_again = False  # 重掃期間又來了事件，掃完補掃一次
+        self._rescan_task = None
         self._extra_index_search = {}
+        self._name_index = {}  # 歌名倒排字符索引，模糊匹配先篩候選
+        self._all_music_keys_cache = None  # 全量歌名列表，all_music 變了就重建
+        self._song_playlist_cache = None  # 歌名 -> 所屬歌單（按匹配優先級）
+        self._picture_url_cache = {}  # 封面路徑 -> 帶簽名的訪問 URL
+        self._local_url_cache = {}  # 本地文件路徑 -> 播放 URL
         self.custom_play_list = None  # 自定義播放列表
+        self._custom_play_list_raw = None  # 上次解析用的 JSON 串
+        self._audio_id_cache = OrderedDict()  # 歌名 -> audio_id，LRU
+        self._audio_id_neg_cache = OrderedDict()  # 搜不到結果的歌名，LRU
 
         # 初始化配置
         self.init_config()
 
         # 初始化日誌
+        self._log_listener = None
         self.setup_logger()
 
         # 初始化計畫任務管理器
@@ -243,19 +373,29 @@ class XiaoMusic:
         self.public_port = self.config.public_port
         if self.public_port == 0:
             self.public_port = self.port
+        # URL 前綴只拼一次，熱路徑直接複用
+        self._url_prefix = f"{self.hostname}:{self.public_port}"
         # 自动3thplay生成播放 post url
-        self.thdtarget = f"{self.hostname}:{self.public_port}/thdaction"  # "HTTP://192.168.1.10:58090/thdaction"
+        self.thdtarget = (
+            self._url_prefix + "/thdaction"
+        )  # "HTTP://192.168.1.10:58090/thdaction"
+
+        # hostname/public_port 可能變化，URL 緩存一併失效
+        self._picture_url_cache = {}
+        self._local_url_cache = {}
 
-        self.active_cmd = self.config.active_cmd.split(",")
-        self.exclude_dirs = set(self.config.exclude_dirs.split(","))
+        # 都只做成員判斷，frozenset 提供 O(1) in 且不可被誤改
+        self.active_cmd = frozenset(self.config.active_cmd.split(","))
+        self.exclude_dirs = frozenset(self.config.exclude_dirs.split(","))
         self.music_path_depth = self.config.music_path_depth
         self.continue_play = self.config.continue_play
 
     def update_devices(self):
         self.device_id_did = {}  # key 为 device_id
         self.groups = {}  # key 为 group_name, value 为 device_id_list
-        XiaoMusicDevice.dict_clear(self.devices)  # 需要清理旧的定时器
         did2group = parse_str_to_dict(self.config.group_list, d1=",", d2=":")
+
+        new_configs = {}
         for did, device in self.config.devices.items():
             group_name = did2group.get(did)
             if not group_name:
@@ -264,7 +404,32 @@ class XiaoMusic:
                 self.groups[group_name] = []
             self.groups[group_name].append(device.device_id)
             self.device_id_did[device.device_id] = did
+            # 快照包含設備構造時固化的全局配置，任一變化都會觸發重建
+            new_configs[did] = (
+                asdict(device),
+                group_name,
+                self.download_path,
+                self.config.ffmpeg_location,
+            )
+
+        # 被移除的設備需要清理旧的定时器
+        for did in list(self.devices):
+            if did not in new_configs:
+                self.devices.pop(did).cancel_all_timer()
+
+        # 只重建配置有變化的設備，配置沒變的保留原定時器，避免整體重建抖動
+        for did, device in self.config.devices.items():
+            if (
+                did in self.devices
+                and self._device_configs.get(did) == new_configs[did]
+            ):
+                continue
+            old_device = self.devices.pop(did, None)
+            if old_device is not None:
+                old_device.cancel_all_timer()
+            group_name = new_configs[did][1]
             self.devices[did] = XiaoMusicDevice(self, device, group_name)
+        self._device_configs = new_configs
 
     def setup_logger(self):
         log_format = f"%(asctime)s [{__version__}] [%(levelname)s] %(filename)s:%(lineno)d: %(message)s"
@@ -292,8 +457,22 @@ class XiaoMusic:
         )
         handler.stream.flush()
         handler.setFormatter(formatter)
+        # 日誌經隊列轉交後台線程落盤，事件循環裡的 log 調用只做入隊，
+        # 避免慢速磁盤（樹莓派 SD 卡）阻塞輪詢協程。
+        # reinit 保存配置時會重複進來，先停掉上一個監聽線程、
+        # 註銷它的 atexit 鉤子並摘掉舊的隊列 handler，避免越積越多
+        if self._log_listener is not None:
+            atexit.unregister(self._log_listener.stop)
+            self._log_listener.stop()
+        log_queue = queue.SimpleQueue()
+        self._log_listener = QueueListener(log_queue, handler)
+        self._log_listener.start()
+        atexit.register(self._log_listener.stop)
         self.log = logging.getLogger("xiaomusic")
-        self.log.addHandler(handler)
+        for old_handler in self.log.handlers[:]:
+            if isinstance(old_handler, QueueHandler):
+                self.log.removeHandler(old_handler)
+        self.log.addHandler(QueueHandler(log_queue))
         self.log.setLevel(logging.DEBUG if self.config.verbose else logging.INFO)
 
     async def poll_latest_ask(self):
@@ -302,7 +481,9 @@ class XiaoMusic:
         定時向小米服務器查詢最新的語音指令，用於觸發音樂播放等功能
         支持 Mina 接口和 XiaoAi 接口兩種方式
         """
-        async with ClientSession() as session:
+        # 複用連接池並緩存 DNS，輪詢每秒一次時避免重複握手和解析
+        connector = TCPConnector(limit_per_host=4, ttl_dns_cache=300)
+        async with ClientSession(connector=connector) as session:
             while True:
                 if not self.config.enable_pull_ask:
                     self.log.debug("Listening new message disabled")
@@ -316,11 +497,12 @@ class XiaoMusic:
 
                 # 拉取所有音箱的对话记录
                 tasks = []
+                last_timestamp = self.last_timestamp
                 for device_id in self.device_id_did:
                     # 首次用当前时间初始化
                     did = self.get_did(device_id)
-                    if did not in self.last_timestamp:
-                        self.last_timestamp[did] = int(time.time() * 1000)
+                    if did not in last_timestamp:
+                        last_timestamp[did] = int(time.time() * 1000)
 
                     hardware = self.get_hardward(device_id)
                     # 判斷是否強制使用 Mina 接口
@@ -339,12 +521,10 @@ class XiaoMusic:
                     if (d := time.perf_counter() - start) < 1:
                         await asyncio.sleep(1 - d)
                 else:
-                    sleep_sec = 0
-                    while True:
-                        await asyncio.sleep(1)
-                        sleep_sec = sleep_sec + 1
-                        if sleep_sec >= self.config.pull_ask_sec:
-                            break
+                    # 一次睡到截止點，避免每秒喚醒事件循環
+                    deadline = start + self.config.pull_ask_sec
+                    if (remaining := deadline - time.perf_counter()) > 0:
+                        await asyncio.sleep(remaining)
 
     async def init_all_data(self, session):
         self.mi_token_home = os.path.join(self.config.conf_path, ".mi.token")
@@ -361,8 +541,6 @@ class XiaoMusic:
         self.cookie_jar = session.cookie_jar
 
     async def need_login(self):
-        if self.mina_service is None:
-            return True
         if self.mina_service is None:
             return True
         if self.login_acount != self.config.account:
@@ -476,9 +654,12 @@ class XiaoMusic:
     async def get_latest_ask_from_xiaoai(self, session, device_id):
         cookies = {"deviceId": device_id}
         retries = 3
+        timeout = ClientTimeout(total=15)
         for i in range(retries):
+            if i > 0:
+                # 加抖動的指數退避，避免所有設備同時重試
+                await asyncio.sleep(0.25 * (2**i) + random.random() * 0.1)
             try:
-                timeout = ClientTimeout(total=15)
                 hardware = self.get_hardward(device_id)
                 url = LATEST_ASK_API.format(
                     hardware=hardware,
@@ -504,7 +685,8 @@ class XiaoMusic:
                 continue
 
             try:
-                data = await r.json()
+                # 每秒輪詢一次，直接從 bytes 解析省掉 content-type 檢查
+                data = _json_loads(await r.read())
             except Exception as e:
                 self.log.warning(f"Execption {e}")
                 if i == 2:
@@ -540,7 +722,10 @@ class XiaoMusic:
         did = self.get_did(device_id)
         self.log.debug(f"_get_last_query device_id:{device_id} did:{did} data:{data}")
         if d := data.get("data"):
-            records = json.loads(d).get("records")
+            # data 字段一般是內嵌的 JSON 字符串，部分服務端變體直接返回對象
+            if isinstance(d, str):
+                d = _json_loads(d)
+            records = d.get("records")
             if not records:
                 return
             last_record = records[0]
@@ -557,18 +742,26 @@ class XiaoMusic:
         query = last_record.get("query", "").strip()
         self.log.debug(f"{did} 獲取到最後一條對話記錄：{query} {timestamp}")
 
-        if timestamp > self.last_timestamp[did]:
-            self.last_timestamp[did] = timestamp
+        # 輪詢熱路徑，last_timestamp 只取一次屬性
+        last_timestamp = self.last_timestamp
+        if timestamp > last_timestamp[did]:
+            last_timestamp[did] = timestamp
             self.last_record = last_record
             self.new_record_event.set()
 
     def get_filename(self, name):
-        if name not in self.all_music:
+        filename = self.all_music.get(name)
+        if filename is None:
             self.log.info(f"get_filename not in. name:{name}")
             return ""
-        filename = self.all_music[name]
         self.log.info(f"try get_filename. filename:{filename}")
+        # 掃描時已確認存在的文件免去 stat（網盤掛載時可能阻塞事件循環），
+        # 掃描之後才出現的文件退回 os.path.exists；刪除由 watchdog 觸發重掃
+        if filename in self._existing_files or filename in self._stat_hits:
+            return filename
         if os.path.exists(filename):
+            # 確認過一次就記住，連續跳歌不用反覆 stat；重掃時清空
+            self._stat_hits.add(filename)
             return filename
         return ""
 
@@ -589,29 +782,34 @@ class XiaoMusic:
 
     # 是否是網絡歌曲
     def is_web_music(self, name):
-        if name not in self.all_music:
-            return False
-        url = self.all_music[name]
-        return url.startswith(("http://", "https://"))
+        # 集合在 _gen_all_music_list 構建，成員必然在 all_music 裡
+        return name in self._web_music_names
 
     # 是否是需要通過api獲取播放鏈接的網絡歌曲
     def is_need_use_play_music_api(self, name):
         return name in self._web_music_api
 
     def get_music_tags(self, name):
-        tags = copy.copy(self.all_music_tags.get(name, asdict(Metadata())))
+        # dict.copy 是 C 實現，缺 tag 時克隆空模板而不是重走 asdict
+        tags = self.all_music_tags.get(name, self._empty_tag).copy()
         picture = tags["picture"]
         if picture:
-            if picture.startswith(self.config.picture_cache_path):
-                picture = picture[len(self.config.picture_cache_path) :]
-            picture = picture.replace("\\", "/")
-            if picture.startswith("/"):
-                picture = picture[1:]
-            encoded_name = urllib.parse.quote(picture)
-            tags["picture"] = try_add_access_control_param(
-                self.config,
-                f"{self.hostname}:{self.public_port}/picture/{encoded_name}",
-            )
+            # 同一封面會被列表接口反覆請求，quote + 加簽結果按原始路徑緩存
+            url = self._picture_url_cache.get(picture)
+            if url is None:
+                rel = picture
+                if rel.startswith(self.config.picture_cache_path):
+                    rel = rel[len(self.config.picture_cache_path) :]
+                rel = rel.replace("\\", "/")
+                if rel.startswith("/"):
+                    rel = rel[1:]
+                encoded_name = urllib.parse.quote(rel)
+                url = try_add_access_control_param(
+                    self.config,
+                    "".join((self._url_prefix, "/picture/", encoded_name)),
+                )
+                self._picture_url_cache[picture] = url
+            tags["picture"] = url
         return tags
 
     # 修改標籤信息
@@ -619,7 +817,7 @@ class XiaoMusic:
         if self._tag_generation_task:
             self.log.info("tag 更新中，請等待")
             return "Tag generation task running"
-        tags = copy.copy(self.all_music_tags.get(name, asdict(Metadata())))
+        tags = self.all_music_tags.get(name, self._empty_tag).copy()
         tags["title"] = info.title
         tags["artist"] = info.artist
         tags["album"] = info.album
@@ -634,7 +832,7 @@ class XiaoMusic:
         if self.config.enable_save_tag and (not self.is_web_music(name)):
             set_music_tag_to_file(file_path, Metadata(tags))
         self.all_music_tags[name] = tags
-        self.try_save_tag_cache()
+        self.mark_tag_cache_dirty()
         return "OK"
 
     async def get_music_sec_url(self, name, true_url):
@@ -751,8 +949,7 @@ class XiaoMusic:
         獲取代理 URL
         將原始 URL base64 編碼後作為參數傳遞給 /proxy 接口
         """
-        urlb64 = base64.b64encode(origin_url.encode("utf-8")).decode("utf-8")
-        proxy_url = f"{self.hostname}:{self.public_port}/proxy?urlb64={urlb64}"
+        proxy_url = _gen_proxy_url(self._url_prefix, origin_url)
         self.log.info(f"Using proxy url: {proxy_url}")
         return proxy_url
 
@@ -763,22 +960,27 @@ class XiaoMusic:
         """
         filename = self.get_filename(name)
 
+        # 靜態曲庫裡同一文件反覆渲染，最終 URL 按文件路徑緩存，
+        # 歌單重掃和配置重載時整體清空
+        url = self._local_url_cache.get(filename)
+        if url is not None:
+            return url
+
         # 處理文件路徑，移除 music_path 前綴，並統一分隔符
-        if filename.startswith(self.config.music_path):
-            filename = filename[len(self.config.music_path) :]
-        filename = filename.replace("\\", "/")
-        if filename.startswith("/"):
-            filename = filename[1:]
+        rel = filename.removeprefix(self.config.music_path)
+        if "\\" in rel:
+            rel = rel.replace("\\", "/")
+        rel = rel.lstrip("/")
 
-        self.log.info(
-            f"_get_local_music_url local music. name:{name}, filename:{filename}"
-        )
+        self.log.info(f"_get_local_music_url local music. name:{name}, filename:{rel}")
 
         # 構造 URL，對文件名進行 URL 編碼
-        encoded_name = urllib.parse.quote(filename)
-        url = f"{self.hostname}:{self.public_port}/music/{encoded_name}"
-        # 嘗試添加訪問控制參數 (如 token)
-        return try_add_access_control_param(self.config, url)
+        encoded_name = urllib.parse.quote(rel)
+        url = try_add_access_control_param(
+            self.config, "".join((self._url_prefix, "/music/", encoded_name))
+        )
+        self._local_url_cache[filename] = url
+        return url
 
     # 给前端调用
     def refresh_music_tag(self):
@@ -787,14 +989,14 @@ class XiaoMusic:
         filename = self.config.tag_cache_path
         if filename is not None:
             # 清空 cache
-            with open(filename, "w", encoding="utf-8") as f:
-                json.dump({}, f, ensure_ascii=False, indent=2)
+            _dump_json_file(filename, {})
             self.log.info("刷新：已清空 tag cache")
         else:
             self.log.info("刷新：tag cache 未啟用")
         # TODO: 优化性能？
         # TODO 如何安全的清空 picture_cache_path
         self.all_music_tags = {}  # 需要清空内存残留
+        self._tag_sigs = {}
         self.try_gen_all_music_tag()
         self.log.info("刷新：已啟動重建 tag cache")
 
@@ -804,8 +1006,13 @@ class XiaoMusic:
         try:
             if filename is not None:
                 if os.path.exists(filename):
-                    with open(filename, encoding="utf-8") as f:
-                        tag_cache = json.load(f)
+                    data = _load_json_file(filename)
+                    if isinstance(data, dict) and data.get("version") == 2:
+                        tag_cache = data.get("tags", {})
+                        self._tag_sigs.update(data.get("sigs", {}))
+                    else:
+                        # 舊格式：整個文件就是 name -> tags
+                        tag_cache = data
                     self.log.info(f"已從【{filename}】加載 tag cache")
                 else:
                     self.log.info(f"【{filename}】tag cache 已啟用，但文件不存在")
@@ -818,12 +1025,33 @@ class XiaoMusic:
     def try_save_tag_cache(self):
         filename = self.config.tag_cache_path
         if filename is not None:
-            with open(filename, "w", encoding="utf-8") as f:
-                json.dump(self.all_music_tags, f, ensure_ascii=False, indent=2)
+            _dump_json_file(
+                filename,
+                {"version": 2, "tags": self.all_music_tags, "sigs": self._tag_sigs},
+            )
             self.log.info(f"保存：tag cache 已保存到【{filename}】")
         else:
             self.log.info("保存：tag cache 未啟用")
 
+    # 標記 tag cache 待保存，短時間內的多次改動合併成一次落盤
+    def mark_tag_cache_dirty(self):
+        loop = self._main_loop
+        if loop is None or not loop.is_running():
+            # 事件循環沒跑，直接同步保存
+            self.try_save_tag_cache()
+            return
+        # 已有待落盤任務時只需置位，不重複排程
+        if self._tag_cache_dirty:
+            return
+        self._tag_cache_dirty = True
+        loop.call_later(5, self._flush_tag_cache)
+
+    def _flush_tag_cache(self):
+        if not self._tag_cache_dirty:
+            return
+        self._tag_cache_dirty = False
+        self.try_save_tag_cache()
+
     def ensure_single_thread_for_tag(self):
         if self._tag_generation_task:
             self.log.info("tag 更新中，請等待")
@@ -831,9 +1059,13 @@ class XiaoMusic:
 
     def try_gen_all_music_tag(self, only_items: dict = None):
         if self.ensure_single_thread_for_tag():
-            loop = asyncio.get_event_loop()
-            if loop.is_running():
-                asyncio.ensure_future(self._gen_all_music_tag(only_items))
+            # 文件變化觸發的重掃在工作線程裡跑，這裡可能不在事件循環線程，
+            # 統一通過 run_coroutine_threadsafe 回到主循環起任務
+            loop = self._main_loop
+            if loop is not None and loop.is_running():
+                asyncio.run_coroutine_threadsafe(
+                    self._gen_all_music_tag(only_items), loop
+                )
                 self.log.info("啟動後台構建 tag cache")
             else:
                 self.log.info("協程時間循環未啟動")
@@ -846,46 +1078,93 @@ class XiaoMusic:
         all_music_tags = self.try_load_from_tag_cache()
         all_music_tags.update(self.all_music_tags)  # 保證最新
 
-        ignore_tag_absolute_dirs = self.config.get_ignore_tag_dirs()
+        ignore_tag_absolute_dirs = tuple(self.config.get_ignore_tag_dirs())
         self.log.info(f"ignore_tag_absolute_dirs: {ignore_tag_absolute_dirs}")
+
+        # 先篩選出需要解析的本地文件；已有 tag 且掃描到的 mtime 沒變的直接跳過，
+        # 文件被覆蓋/修改過的重新解析
+        pending = {}
+        pending_sigs = {}
         for name, file_or_url in only_items.items():
-            start = time.perf_counter()
-            if name not in all_music_tags:
-                try:
-                    if self.is_web_music(name):
-                        # TODO: 網絡歌曲獲取歌曲額外信息
-                        pass
-                    elif os.path.exists(file_or_url) and not_in_dirs(
-                        file_or_url, ignore_tag_absolute_dirs
-                    ):
-                        all_music_tags[name] = extract_audio_metadata(
-                            file_or_url, self.config.picture_cache_path
-                        )
-                    else:
-                        self.log.info(f"{name}/{file_or_url} 無法更新 tag")
-                except BaseException as e:
-                    self.log.exception(f"{e} {file_or_url} error {type(file_or_url)}!")
-            if (time.perf_counter() - start) < 1:
-                await asyncio.sleep(0.001)
-            else:
-                # 处理一首歌超过1秒，则等1秒，解决挂载网盘卡死的问题
-                await asyncio.sleep(1)
+            if name in all_music_tags:
+                old_sig = self._tag_sigs.get(name)
+                new_sig = self._file_mtimes.get(file_or_url)
+                if old_sig is None or new_sig is None or old_sig == new_sig:
+                    continue
+            try:
+                if self.is_web_music(name):
+                    # TODO: 網絡歌曲獲取歌曲額外信息
+                    pass
+                elif (
+                    # 掃描時記下的文件集合免去逐個 stat，沒掃到的才真查一次
+                    file_or_url in self._existing_files or os.path.exists(file_or_url)
+                ) and not_in_dirs(file_or_url, ignore_tag_absolute_dirs):
+                    pending[name] = file_or_url
+                    pending_sigs[name] = self._file_mtimes.get(file_or_url)
+                else:
+                    self.log.info(f"{name}/{file_or_url} 無法更新 tag")
+            except BaseException as e:
+                self.log.exception(f"{e} {file_or_url} error {type(file_or_url)}!")
+
+        # mutagen 解析是純 Python 的 CPU 密集操作，用進程池繞開 GIL，
+        # 每個子任務處理一批文件攤薄進程間通信開銷
+        loop = asyncio.get_event_loop()
+        workers = os.cpu_count() or 1
+        batch_size = 64
+        names = list(pending.keys())
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            stride = batch_size * workers
+            for i in range(0, len(names), stride):
+                batch = names[i : i + stride]
+                start = time.perf_counter()
+                futures = [
+                    loop.run_in_executor(
+                        executor,
+                        extract_audio_metadata_batch,
+                        [pending[name] for name in batch[j : j + batch_size]],
+                        self.config.picture_cache_path,
+                    )
+                    for j in range(0, len(batch), batch_size)
+                ]
+                chunk_results = await asyncio.gather(*futures, return_exceptions=True)
+                for j, chunk_result in enumerate(chunk_results):
+                    chunk_names = batch[j * batch_size : (j + 1) * batch_size]
+                    if isinstance(chunk_result, BaseException):
+                        self.log.exception(f"{chunk_result} 批量解析 tag 失敗!")
+                        continue
+                    for name, result in zip(chunk_names, chunk_result, strict=True):
+                        if result is None:
+                            self.log.warning(f"{pending[name]} 無法解析 tag")
+                        else:
+                            all_music_tags[name] = result
+                            if pending_sigs[name] is not None:
+                                self._tag_sigs[name] = pending_sigs[name]
+                if (time.perf_counter() - start) < len(batch):
+                    # 零秒 sleep 也會把控制權交回事件循環，但沒有計時器開銷
+                    await asyncio.sleep(0)
+                else:
+                    # 处理一首歌超过1秒，则等1秒，解决挂载网盘卡死的问题
+                    await asyncio.sleep(1)
         # 全部更新结束后，一次性赋值
         self.all_music_tags = all_music_tags
         # 刷新 tag cache
-        self.try_save_tag_cache()
+        self.mark_tag_cache_dirty()
         self._tag_generation_task = False
         self.log.info("tag 更新完成")
 
     # 獲取目錄下所有歌曲,生成隨機播放列表
     def _gen_all_music_list(self):
-        self.all_music = {}
+        # 整個重建過程都在局部變量裡做，最後一次性發布；
+        # 重掃在工作線程裡跑時，事件循環側不會看到空的或半成品的曲庫
+        all_music = {}
         all_music_by_dir = {}
+        file_mtimes = {}
         local_musics = traverse_music_directory(
             self.music_path,
             depth=self.music_path_depth,
             exclude_dirs=self.exclude_dirs,
             support_extension=SUPPORT_MUSIC_TYPE,
+            mtimes=file_mtimes,
         )
         for dir_name, files in local_musics.items():
             if len(files) == 0:
@@ -898,17 +1177,19 @@ class XiaoMusic:
                 dir_name = "下載"
             if dir_name not in all_music_by_dir:
                 all_music_by_dir[dir_name] = {}
-            for file in files:
-                # 歌曲名字相同會覆蓋
-                filename = os.path.basename(file)
-                (name, _) = os.path.splitext(filename)
-                self.all_music[name] = file
-                all_music_by_dir[dir_name][name] = True
-                self.log.debug(f"_gen_all_music_list {name}:{dir_name}:{file}")
+            # 先收集平行的 name/file 列表，再整批合入字典；
+            # 歌曲名字相同會覆蓋
+            names = [os.path.splitext(os.path.basename(file))[0] for file in files]
+            all_music.update(zip(names, files, strict=True))
+            all_music_by_dir[dir_name].update(dict.fromkeys(names, True))
+            self.log.debug(f"_gen_all_music_list dir:{dir_name} count:{len(files)}")
 
-        # self.log.debug(self.all_music)
+        # 此時 all_music 只含掃描到的本地文件，記下來給 get_filename 免 stat
+        existing_files = frozenset(all_music.values())
 
-        self.music_list = OrderedDict(
+        # self.log.debug(all_music)
+
+        music_list = OrderedDict(
             {
                 "臨時搜索列表": [],
                 "所有歌曲": [],
@@ -921,76 +1202,204 @@ class XiaoMusic:
             }
         )
         # 最近新增(不包含網絡歌單)
-        self.music_list["最近新增"] = sorted(
-            self.all_music.keys(),
-            key=lambda x: os.path.getmtime(self.all_music[x]),
+        # mtime 直接用掃描時 scandir 緩存的 stat 結果，不再逐個 getmtime
+        mtimes = {}
+        for name, path in all_music.items():
+            mtimes[name] = file_mtimes.get(path, 0.0)
+        music_list["最近新增"] = sorted(
+            mtimes,
+            key=mtimes.__getitem__,
             reverse=True,
         )[: self.config.recently_added_playlist_len]
 
         # 網絡歌單
+        all_radio, web_music_api = {}, {}
         try:
-            # NOTE: 函数内会更新 self.all_music, self._music_list；重建 self._all_radio
-            self._append_music_list()
+            all_radio, web_music_api = self._append_music_list(all_music, music_list)
         except Exception as e:
             self.log.exception(f"Execption {e}")
 
-        # 全部，所有，自定義歌單（收藏）
-        self.music_list["全部"] = list(self.all_music.keys())
-        self.music_list["所有歌曲"] = [
-            name for name in self.all_music.keys() if name not in self._all_radio
-        ]
+        # 全部，所有，自定義歌單（收藏）；同一趟循環順帶重建搜索索引和
+        # 網絡歌曲集合，避免對 all_music 的多次全量遍歷
+        all_names = []
+        all_songs = []
+        extra_index_search = {}
+        web_music_names = set()
+        # 綁定成局部變量，循環體內少做屬性查找
+        append_name = all_names.append
+        append_song = all_songs.append
+        add_web = web_music_names.add
+        is_radio = all_radio.__contains__
+        for name, url in all_music.items():
+            append_name(name)
+            if not is_radio(name):
+                append_song(name)
+            # 如果不是 url，則增加索引
+            if url.startswith("http"):
+                add_web(name)
+            else:
+                extra_index_search[url] = name
+        music_list["全部"] = all_names
+        music_list["所有歌曲"] = all_songs
 
         # 文件夾歌單
         for dir_name, musics in all_music_by_dir.items():
-            self.music_list[dir_name] = list(musics.keys())
-            # self.log.debug("dir_name:%s, list:%s", dir_name, self.music_list[dir_name])
-
-        # 歌單排序
-        for _, play_list in self.music_list.items():
-            play_list.sort(key=custom_sort_key)
+            music_list[dir_name] = list(musics.keys())
+            # self.log.debug("dir_name:%s, list:%s", dir_name, music_list[dir_name])
+
+        # 歌單排序；曲庫變了，先清掉舊的排序鍵緩存。
+        # 此時各歌單都是「全部」的子集，全部排一次後其餘歌單按名次重排即可，
+        # 不用每個歌單都重新算一遍排序鍵（排序鍵含歌名本身，名次序等價）
+        _cached_sort_key.cache_clear()
+        full_sorted = sorted(music_list["全部"], key=_cached_sort_key)
+        music_list["全部"] = full_sorted
+        rank = {name: i for i, name in enumerate(full_sorted)}
+        for list_name, play_list in music_list.items():
+            if list_name != "全部":
+                play_list.sort(key=rank.__getitem__)
 
         # 非自定義歌單
-        self.default_music_list_names = list(self.music_list.keys())
+        default_music_list_names = list(music_list.keys())
 
-        # 刷新自定義歌單
-        self.refresh_custom_play_list()
+        # 合併自定義歌單；全量重建直接在局部字典上合，
+        # 不走 refresh_custom_play_list（它操作的是已發布的 music_list）
+        try:
+            for k, v in self.get_custom_play_list().items():
+                music_list[k] = list(v)
+        except Exception as e:
+            self.log.exception(f"Execption {e}")
+
+        # 一次性發布構建結果
+        self.all_music = all_music
+        self._all_radio = all_radio
+        self._web_music_api = web_music_api
+        self.music_list = music_list
+        self._existing_files = existing_files
+        self._stat_hits = set()
+        self._file_mtimes = file_mtimes
+        self._local_url_cache = {}
+        self._extra_index_search = extra_index_search
+        self._web_music_names = frozenset(web_music_names)
+        self.default_music_list_names = default_music_list_names
+        self._song_playlist_cache = None
+        self._all_music_keys_cache = None
+        self._build_name_index(all_music)
 
         # 更新每個設備的歌單
         self.update_all_playlist()
 
-        # 重建索引
-        self._extra_index_search = {}
-        for k, v in self.all_music.items():
-            # 如果不是 url，則增加索引
-            if not (v.startswith("http") or v.startswith("https")):
-                self._extra_index_search[v] = k
-
         # all_music 更新，重建 tag
         self.try_gen_all_music_tag()
 
+    # 重建歌名倒排字符索引。watchdog 的增刪改事件最終都會走到
+    # _gen_all_music_list，索引跟著整體重建一次即可
+    def _build_name_index(self, all_music):
+        name_index = {}
+        for name in all_music.keys():
+            for ch in set(name.lower()):
+                if ch in name_index:
+                    name_index[ch].append(name)
+                else:
+                    name_index[ch] = [name]
+        self._name_index = name_index
+
+    # 全量歌名列表只在倒排索引篩不到候選時兜底用，緩存住免得每次搜索重建
+    def _all_music_keys(self):
+        if self._all_music_keys_cache is None:
+            self._all_music_keys_cache = list(self.all_music.keys())
+        return self._all_music_keys_cache
+
+    # 歌名 -> 所屬歌單的反查表，替代逐歌單的線性掃描。
+    # 按匹配優先級從低到高寫入，高優先級後寫覆蓋，查詢時 O(1) 取結果
+    def find_cur_playlist(self, name):
+        cache = self._song_playlist_cache
+        if cache is None:
+            cache = {}
+            music_list = self.music_list
+            for list_name in ("所有電台", "所有歌曲"):
+                for song in music_list.get(list_name, ()):
+                    cache[song] = list_name
+            skip = ("全部", "所有歌曲", "所有電台", "臨時搜索列表")
+            # 多個自定義歌單都包含時取 music_list 裡靠前的那個，
+            # 所以倒序寫入讓靠前的覆蓋靠後的
+            for list_name in reversed(list(music_list.keys())):
+                if list_name in skip:
+                    continue
+                for song in music_list[list_name]:
+                    cache[song] = list_name
+            for list_name in ("最近新增", "收藏"):
+                for song in music_list.get(list_name, ()):
+                    cache[song] = list_name
+            self._song_playlist_cache = cache
+        return cache.get(name, "全部")
+
+    # 根據查詢字符篩出候選歌名（按共享字符數排序，最多 limit 個），
+    # 讓模糊匹配只比較候選而不是整個曲庫；沒有候選時返回空列表
+    def _index_candidates(self, query, limit=64):
+        if not self._name_index:
+            return []
+        counter = Counter()
+        for ch in set(query.lower()):
+            names = self._name_index.get(ch)
+            if names:
+                counter.update(names)
+        return [name for name, _ in counter.most_common(limit)]
+
+    # 單曲刪除時增量摘掉這首歌，避免整個曲庫重掃一遍
+    def _remove_music_entry(self, name):
+        path = self.all_music.pop(name, None)
+        if path is None:
+            return
+        self._all_music_keys_cache = None
+        self._extra_index_search.pop(path, None)
+        self.all_music_tags.pop(name, None)
+        self._tag_sigs.pop(name, None)
+        self._file_mtimes.pop(path, None)
+        self._local_url_cache.pop(path, None)
+        self._existing_files = self._existing_files - {path}
+        self._stat_hits.discard(path)
+        for play_list in self.music_list.values():
+            try:
+                play_list.remove(name)
+            except ValueError:
+                pass
+        for ch in set(name.lower()):
+            names = self._name_index.get(ch)
+            if names is not None:
+                try:
+                    names.remove(name)
+                except ValueError:
+                    pass
+        self._song_playlist_cache = None
+        self.update_all_playlist()
+
     def refresh_custom_play_list(self):
         try:
             # 刪除舊的自定義個歌單
+            default_names = set(self.default_music_list_names)
             for k in list(self.music_list.keys()):
-                if k not in self.default_music_list_names:
+                if k not in default_names:
                     del self.music_list[k]
             # 合併新的自定義個歌單
             custom_play_list = self.get_custom_play_list()
             for k, v in custom_play_list.items():
                 self.music_list[k] = list(v)
+            # 歌單集合變了，反查表下次查詢時重建
+            self._song_playlist_cache = None
         except Exception as e:
             self.log.exception(f"Execption {e}")
 
-    # 給歌單裡補充網絡歌單
-    def _append_music_list(self):
+    # 給歌單裡補充網絡歌單；在傳入的局部字典上操作，
+    # 構建結果由 _gen_all_music_list 統一發布
+    def _append_music_list(self, all_music, music_list):
+        all_radio = {}
+        web_music_api = {}
         if not self.config.music_list_json:
-            return
+            return all_radio, web_music_api
 
-        self._all_radio = {}
-        self._web_music_api = {}
-        music_list = json.loads(self.config.music_list_json)
+        network_music_list = _json_loads(self.config.music_list_json)
         try:
-            for item in music_list:
+            for item in network_music_list:
                 list_name = item.get("name")
                 musics = item.get("musics")
                 if (not list_name) or (not musics):
@@ -1002,23 +1411,24 @@ class XiaoMusic:
                     music_type = music.get("type")
                     if (not name) or (not url):
                         continue
-                    self.all_music[name] = url
+                    all_music[name] = url
                     one_music_list.append(name)
 
                     # 處理電台列表
                     if music_type == "radio":
-                        self._all_radio[name] = url
+                        all_radio[name] = url
                     if music.get("api"):
-                        self._web_music_api[name] = music
+                        web_music_api[name] = music
                 self.log.debug(one_music_list)
                 # 歌曲名字相同會覆蓋
-                self.music_list[list_name] = one_music_list
-            if self._all_radio:
-                self.music_list["所有電台"] = list(self._all_radio.keys())
-            # self.log.debug(self.all_music)
-            # self.log.debug(self.music_list)
+                music_list[list_name] = one_music_list
+            if all_radio:
+                music_list["所有電台"] = list(all_radio.keys())
+            # self.log.debug(all_music)
+            # self.log.debug(music_list)
         except Exception as e:
             self.log.exception(f"Execption {e}")
+        return all_radio, web_music_api
 
     async def analytics_task_daily(self):
         while True:
@@ -1047,9 +1457,43 @@ class XiaoMusic:
         self._observer.start()
         self.log.info(f"已啟動對 {self.music_path} 的目錄監控。")
 
-    def _on_file_change(self):
-        self.log.info("檢測到目錄音樂文件變化，正在刷新歌曲列表。")
-        self._gen_all_music_list()
+    def _on_file_change(self, events=()):
+        # 重掃進行中時事件不能丟（watcher 已經清空了自己的隊列），
+        # 記一筆，這一輪掃完再補掃一次
+        if self._rescan_pending:
+            self._rescan_again = True
+            return
+        self.log.info(
+            "檢測到目錄音樂文件變化（合併了 %d 個事件），正在刷新歌曲列表。",
+            len(events) or 1,
+        )
+        # 只有刪除事件時增量摘歌就夠了，免去整個曲庫重掃；
+        # 有路徑對不上號的（比如路徑寫法不一致）就退回全量重掃兜底
+        if events and all(op == "deleted" for op, _src, _dest in events):
+            name_by_path = {path: name for name, path in self.all_music.items()}
+            names = [
+                name_by_path[src] for _op, src, _dest in events if src in name_by_path
+            ]
+            if len(names) == len(events):
+                for name in names:
+                    self._remove_music_entry(name)
+                return
+        self._rescan_pending = True
+        self._rescan_task = asyncio.create_task(self._rescan_music_list())
+
+    async def _rescan_music_list(self):
+        try:
+            while True:
+                self._rescan_again = False
+                # 全量重掃放到線程裡跑，避免大曲庫掃描期間卡住事件循環
+                await asyncio.to_thread(self._gen_all_music_list)
+                if not self._rescan_again:
+                    break
+                self.log.info("重掃期間又有文件變化，再補掃一次。")
+        except Exception as e:
+            self.log.exception(f"Execption {e}")
+        finally:
+            self._rescan_pending = False
 
     def stop_file_watch(self):
         if hasattr(self, "_observer"):
@@ -1059,6 +1503,11 @@ class XiaoMusic:
 
     async def run_forever(self):
         self.log.info("run_forever start")
+        self._main_loop = asyncio.get_running_loop()
+        # 3.12 起的急切任務工廠讓小協程在第一個真正的 await 前
+        # 直接跑完，省掉一次事件循環調度；低版本維持默認行為
+        if hasattr(asyncio, "eager_task_factory"):
+            self._main_loop.set_task_factory(asyncio.eager_task_factory)
         self.try_gen_all_music_tag()  # 事件循環開始後調用一次
         self.crontab.start()
         asyncio.create_task(self.analytics.send_startup_event())
@@ -1160,15 +1609,14 @@ class XiaoMusic:
             return (opvalue, "")
 
         for opkey in self.config.key_match_order:
-            patternarg = rf"(.*){opkey}(.*)"
-            # 匹配參數
-            matcharg = re.match(patternarg, query)
-            if not matcharg:
-                # self.log.debug(patternarg)
+            # 原來的 (.*){opkey}(.*) 貪婪匹配等價於按最後一次出現切分，
+            # rfind 一次 C 調用即可，不必每條指令都編譯正則
+            idx = query.rfind(opkey)
+            if idx < 0:
                 continue
 
-            argpre = matcharg.groups()[0]
-            argafter = matcharg.groups()[1]
+            argpre = query[:idx]
+            argafter = query[idx + len(opkey) :]
             self.log.debug(
                 "matcharg. opkey:%s, argpre:%s, argafter:%s",
                 opkey,
@@ -1204,7 +1652,8 @@ class XiaoMusic:
             self.log.debug("沒開啟模糊匹配")
             return []
 
-        all_music_list = list(self.all_music.keys())
+        # 先用倒排索引篩候選，避免每條語音指令都全庫掃描
+        all_music_list = self._index_candidates(name) or self._all_music_keys()
         real_names = find_best_match(
             name,
             all_music_list,
@@ -1302,8 +1751,8 @@ class XiaoMusic:
             self.log.info(f"del ${filename} success")
         except OSError:
             self.log.error(f"del ${filename} failed")
-        # TODO: 这里可以优化性能
-        self._gen_all_music_list()
+        # 單曲刪除走增量路徑；批量變化仍由目錄監控觸發全量重掃
+        self._remove_music_entry(name)
 
     # ===========================MusicFree插件函數================================
 
@@ -1339,8 +1788,7 @@ class XiaoMusic:
             # 插件在線搜索
             return await self.get_music_list_mf(plugin, keyword, page, limit)
 
-    @staticmethod
-    async def get_real_url_of_openapi(url: str, timeout: int = 10) -> dict:
+    async def get_real_url_of_openapi(self, url: str, timeout: int = 10) -> dict:
         """
         通過服務端代理獲取開放接口真實的音樂播放URL，避免CORS問題
         Args:
@@ -1350,44 +1798,9 @@ class XiaoMusic:
         Returns:
             dict: 包含success、realUrl、statusCode等信息的字典
         """
-        from urllib.parse import urlparse
-
-        import aiohttp
-
-        # 內部輔助函數：檢查主機解析到的IP是否安全，防止訪問內網/本地地址
-        def _is_safe_hostname(parsed) -> bool:
-            hostname = parsed.hostname
-            if not hostname:
-                return False
-            try:
-                # 解析主機名對應的所有地址
-                addrinfo_list = socket.getaddrinfo(hostname, None)
-            except Exception:
-                return False
-            for family, _, _, _, sockaddr in addrinfo_list:
-                ip_str = (
-                    sockaddr[0] if family in (socket.AF_INET, socket.AF_INET6) else None
-                )
-                if not ip_str:
-                    continue
-                try:
-                    ip_obj = ipaddress.ip_address(ip_str)
-                except ValueError:
-                    return False
-                # 拒绝内网、回环、链路本地、多播和保留地址
-                if (
-                    ip_obj.is_private
-                    or ip_obj.is_loopback
-                    or ip_obj.is_link_local
-                    or ip_obj.is_multicast
-                    or ip_obj.is_reserved
-                ):
-                    return False
-            return True
-
         try:
             # 驗證URL格式
-            parsed_url = urlparse(url)
+            parsed_url = urllib.parse.urlparse(url)
             if not parsed_url.scheme or not parsed_url.netloc:
                 return {"success": False, "url": url, "error": "Invalid URL format"}
             # 僅允許 http/https
@@ -1398,32 +1811,35 @@ class XiaoMusic:
                     "error": "Unsupported URL scheme",
                 }
             # 檢查主機是否安全，防止SSRF到內網
-            if not _is_safe_hostname(parsed_url):
+            if not await _is_safe_hostname(parsed_url.hostname):
                 return {
                     "success": False,
                     "url": url,
                     "error": "Unsafe target host",
                 }
 
-            # 創建aiohttp客戶端會話
-            async with aiohttp.ClientSession() as session:
-                # 發送HEAD請求跟隨重定向
-                async with session.head(
-                    url,
-                    allow_redirects=True,
-                    timeout=aiohttp.ClientTimeout(total=timeout),
-                ) as response:
-                    # 獲取最終重定向後的URL
-                    final_url = str(response.url)
-
-                    return {
-                        "success": True,
-                        "url": final_url,
-                        "statusCode": response.status,
-                    }
+            # 優先復用全局會話的連接池，省掉每次的 TCP+TLS 握手
+            if self.session is not None:
+                return await self._head_real_url(self.session, url, timeout)
+            async with ClientSession() as session:
+                return await self._head_real_url(session, url, timeout)
         except Exception as e:
             return {"success": False, "url": url, "error": f"Error occurred: {str(e)}"}
 
+    @staticmethod
+    async def _head_real_url(session, url, timeout) -> dict:
+        # 發送HEAD請求跟隨重定向，獲取最終重定向後的URL
+        async with session.head(
+            url,
+            allow_redirects=True,
+            timeout=ClientTimeout(total=timeout),
+        ) as response:
+            return {
+                "success": True,
+                "url": str(response.url),
+                "statusCode": response.status,
+            }
+
     # 調用MusicFree插件獲取歌曲列表
     async def get_music_list_mf(
         self, plugin="all", keyword="", page=1, limit=20, **kwargs
@@ -1487,9 +1903,7 @@ class XiaoMusic:
         plugin_results = await asyncio.gather(*search_tasks, return_exceptions=True)
 
         # 處理搜索結果
-        for i, result in enumerate(plugin_results):
-            plugin_name = list(enabled_plugins)[i]
-
+        for plugin_name, result in zip(enabled_plugins, plugin_results, strict=True):
             # 檢查是否為異常對象
             if isinstance(result, Exception):
                 self.log.error(f"插件 {plugin_name} 搜索失敗: {result}")
@@ -1537,7 +1951,10 @@ class XiaoMusic:
     async def _search_specific_plugin(self, plugin, keyword, artist, page, limit):
         """搜索指定插件"""
         try:
-            results = self.js_plugin_manager.search(plugin, keyword, page, limit)
+            # search 會同步等 Node 子進程回包，放到線程裡免得卡住事件循環
+            results = await asyncio.to_thread(
+                self.js_plugin_manager.search, plugin, keyword, page, limit
+            )
 
             # 額外檢查 resources 字段
             data_list = results.get("data", [])
@@ -1561,7 +1978,10 @@ class XiaoMusic:
     async def _search_plugin_task(self, plugin_name, keyword, page, limit):
         """單個插件搜索任務"""
         try:
-            return self.js_plugin_manager.search(plugin_name, keyword, page, limit)
+            # search 會同步等 Node 子進程回包，放到線程裡免得卡住事件循環
+            return await asyncio.to_thread(
+                self.js_plugin_manager.search, plugin_name, keyword, page, limit
+            )
         except Exception as e:
             # 直接拋出異常，讓 asyncio.gather 處理
             raise e
@@ -1662,12 +2082,15 @@ class XiaoMusic:
             if len(music_items) == 1:
                 return music_items[0]
 
+            # 關鍵詞只處理一次，不在每個候選項裡重複 lower/split
+            keyword = search_key.lower()
+            keyword_parts = tuple(keyword.split())
+
             # 計算每個項目的匹配分數
             def calculate_match_score(item):
                 """計算匹配分數"""
                 title = item.get("title", "").lower() if item.get("title") else ""
                 artist = item.get("artist", "").lower() if item.get("artist") else ""
-                keyword = search_key.lower()
 
                 if not keyword:
                     return 0
@@ -1687,8 +2110,8 @@ class XiaoMusic:
                     # 包含匹配
                     else:
                         score += 30
-                # 部分字符匹配
-                elif any(char in title for char in keyword.split()):
+                # 部分詞匹配
+                elif any(part in title for part in keyword_parts):
                     score += 10
                 # 藝術家名匹配權重
                 if keyword in artist:
@@ -1704,14 +2127,23 @@ class XiaoMusic:
                     # 包含匹配
                     else:
                         score += 3
-                # 部分字符匹配
-                elif any(char in artist for char in keyword.split()):
+                # 部分詞匹配
+                elif any(part in artist for part in keyword_parts):
                     score += 1
                 return score
 
-            # 按匹配分數排序，返回分數最高的項目
-            sorted_items = sorted(music_items, key=calculate_match_score, reverse=True)
-            return sorted_items[0]
+            # 只要分數最高的一個，不用整個排一遍；
+            # 滿分是 99（歌名完全匹配 90 + 歌手完全匹配 9），到頂提前收工
+            best_item = music_items[0]
+            best_score = -1
+            for item in music_items:
+                score = calculate_match_score(item)
+                if score > best_score:
+                    best_item = item
+                    best_score = score
+                    if score >= 99:
+                        break
+            return best_item
 
         except Exception as e:
             self.log.error(f"_search_top_one error: {e}")
@@ -1762,9 +2194,8 @@ class XiaoMusic:
 
     # 播放一個播放列表裡第幾個
     async def play_music_list_index(self, did="", arg1="", **kwargs):
-        patternarg = r"^([零一二三四五六七八九十百千万亿]+)个(.*)"
         # 匹配參數
-        matcharg = re.match(patternarg, arg1)
+        matcharg = _PLAY_INDEX_RE.match(arg1)
         if not matcharg:
             return await self.play_music_list(did, arg1)
 
@@ -1819,7 +2250,6 @@ class XiaoMusic:
         else:
             proxy_base = "http://192.168.31.241:8090"
         search_audio = proxy_base + "/static/search.mp3"
-        proxy_base + "/static/silence.mp3"
         await self.play_url(self.get_cur_did(), search_audio)
 
         # TODO 添加一個定時器，4秒後觸發
@@ -1900,19 +2330,19 @@ class XiaoMusic:
             device.update_playlist()
 
     def get_custom_play_list(self):
-        if self.custom_play_list is None:
-            self.custom_play_list = {}
-            if self.config.custom_play_list_json:
-                self.custom_play_list = json.loads(self.config.custom_play_list_json)
+        raw = self.config.custom_play_list_json
+        # 原始串沒變就復用上次的解析結果；配置重載換了串才重新 loads
+        if self.custom_play_list is not None and raw == self._custom_play_list_raw:
+            return self.custom_play_list
+        self.custom_play_list = _json_loads(raw) if raw else {}
+        self._custom_play_list_raw = raw
         return self.custom_play_list
 
     def save_custom_play_list(self):
-        custom_play_list = self.get_custom_play_list()
         self.refresh_custom_play_list()
-        self.config.custom_play_list_json = json.dumps(
-            custom_play_list, ensure_ascii=False
-        )
-        self.save_cur_config()
+        # JSON 串留到真正落盤時（save_cur_config）才生成，
+        # 批量編輯歌單時把多次保存合併成一次整配置序列化和寫盤
+        self.mark_config_dirty()
 
     # 新增歌單
     def play_list_add(self, name):
@@ -1968,8 +2398,10 @@ class XiaoMusic:
             if not self.play_list_add(name):
                 return False
         play_list = []
+        seen = set()  # 歌單用 list 保序，去重交給 set
         for music_name in music_list:
-            if (music_name in self.all_music) and (music_name not in play_list):
+            if (music_name in self.all_music) and (music_name not in seen):
+                seen.add(music_name)
                 play_list.append(music_name)
         # 直接覆蓋
         custom_play_list[name] = play_list
@@ -1984,8 +2416,10 @@ class XiaoMusic:
             if not self.play_list_add(name):
                 return False
         play_list = custom_play_list[name]
+        existing = set(play_list)  # 批量添加時避免對 list 的逐個線性查找
         for music_name in music_list:
-            if (music_name in self.all_music) and (music_name not in play_list):
+            if (music_name in self.all_music) and (music_name not in existing):
+                existing.add(music_name)
                 play_list.append(music_name)
         self.save_custom_play_list()
         return True
@@ -1995,10 +2429,9 @@ class XiaoMusic:
         custom_play_list = self.get_custom_play_list()
         if name not in custom_play_list:
             return False
+        remove_set = set(music_list)
         play_list = custom_play_list[name]
-        for music_name in music_list:
-            if music_name in play_list:
-                play_list.remove(music_name)
+        custom_play_list[name] = [x for x in play_list if x not in remove_set]
         self.save_custom_play_list()
         return True
 
@@ -2037,7 +2470,7 @@ class XiaoMusic:
 
     # 搜索音樂
     def searchmusic(self, name):
-        all_music_list = list(self.all_music.keys())
+        all_music_list = self._index_candidates(name) or self._all_music_keys()
         search_list = fuzzyfinder(name, all_music_list, self._extra_index_search)
         self.log.debug(f"searchmusic. name:{name} search_list:{search_list}")
         return search_list
@@ -2089,11 +2522,10 @@ class XiaoMusic:
         # 重新初始化
         await self.reinit()
 
-    # 配置文檔落地
+    # 配置文檔落地；_dump_json_file 優先走 orjson 並原子替換
     def do_saveconfig(self, data):
         filename = self.config.getsettingfile()
-        with open(filename, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        _dump_json_file(filename, data)
 
     # 把當前配置落地
     def save_cur_config(self):
@@ -2101,10 +2533,41 @@ class XiaoMusic:
             deviceobj = self.devices.get(did)
             if deviceobj is not None:
                 self.config.devices[did] = deviceobj.device
+        # 自定義歌單以內存對象為準，落盤時才序列化回 JSON 串
+        if self.custom_play_list is not None:
+            if orjson is not None:
+                # orjson 直接輸出 UTF-8，效果等同 ensure_ascii=False
+                self.config.custom_play_list_json = orjson.dumps(
+                    self.custom_play_list
+                ).decode()
+            else:
+                self.config.custom_play_list_json = json.dumps(
+                    self.custom_play_list, ensure_ascii=False
+                )
+            # 剛序列化的串對應的就是當前內存對象，別讓下次讀取又反解一遍
+            self._custom_play_list_raw = self.config.custom_play_list_json
         data = asdict(self.config)
         self.do_saveconfig(data)
         self.log.info("save_cur_config ok")
 
+    # 標記配置待保存，短窗口內的連續改動只落盤一次
+    def mark_config_dirty(self):
+        loop = self._main_loop
+        if loop is None or not loop.is_running():
+            # 事件循環沒跑，直接同步保存
+            self.save_cur_config()
+            return
+        if self._config_save_dirty:
+            return
+        self._config_save_dirty = True
+        loop.call_later(0.5, self._flush_cur_config)
+
+    def _flush_cur_config(self):
+        if not self._config_save_dirty:
+            return
+        self._config_save_dirty = False
+        self.save_cur_config()
+
     def update_config_from_setting(self, data):
         # 保存之前的 enable_file_watch 配置
         pre_efw = self.config.enable_file_watch
@@ -2202,6 +2665,10 @@ class XiaoMusicDevice:
         self._play_failed_cnt = 0
 
         self._play_list = []
+        self._play_list_shared = False  # _play_list 是否與全局歌單共享引用
+        self._play_list_index = None  # 歌名 -> 下標，列表變更後懶重建
+        self._group_rest_task = None  # 組內其他設備的後台播放任務，持引用防回收
+        self._next_task = None  # 定時器觸發後的切歌任務，持引用防回收
 
         # 關機定時器
         self._stop_timer = None
@@ -2243,24 +2710,58 @@ class XiaoMusicDevice:
             pass  # 指定了已知的播放列表名稱
 
         list_name = self.device.cur_playlist
-        self._play_list = copy.copy(self.xiaomusic.music_list[list_name])
+        src = self.xiaomusic.music_list[list_name]
+        self._play_list_index = None
 
         if reorder:
             if self.device.play_type == PLAY_TYPE_RND:
-                random.shuffle(self._play_list)
+                # sample 一步完成拷貝加洗牌，不用先 copy 再 shuffle
+                self._play_list = random.sample(src, len(src))
+                self._play_list_shared = False
                 self.log.info(
-                    f"隨機打亂 {list_name} {list2str(self._play_list, self.config.verbose)}"
+                    "隨機打亂 %s %s",
+                    list_name,
+                    LazyList2Str(self._play_list, self.config.verbose),
+                )
+            elif (
+                list_name != "臨時搜索列表"
+                and list_name in self.xiaomusic.default_music_list_names
+            ):
+                # 默認歌單在 _gen_all_music_list 裡已按 custom_sort_key 排好，
+                # 不用再排，直接共享引用
+                self._play_list = src
+                self._play_list_shared = True
+                self.log.info(
+                    "沒打亂 %s %s",
+                    list_name,
+                    LazyList2Str(self._play_list, self.config.verbose),
                 )
             else:
-                self._play_list.sort(key=custom_sort_key)
+                # 自定義歌單和臨時搜索列表不保證有序，仍要排一次
+                self._play_list = list(src)
+                self._play_list_shared = False
+                self._play_list.sort(key=_cached_sort_key)
                 self.log.info(
-                    f"沒打亂 {list_name} {list2str(self._play_list, self.config.verbose)}"
+                    "沒打亂 %s %s",
+                    list_name,
+                    LazyList2Str(self._play_list, self.config.verbose),
                 )
         else:
+            # 不重排時直接共享全局歌單引用，要寫入時再拷貝
+            self._play_list = src
+            self._play_list_shared = True
             self.log.info(
-                f"更新 {list_name} {list2str(self._play_list, self.config.verbose)}"
+                "更新 %s %s",
+                list_name,
+                LazyList2Str(self._play_list, self.config.verbose),
             )
 
+    # 共享引用狀態下寫入前先拷貝，避免改壞全局歌單
+    def _ensure_play_list_private(self):
+        if self._play_list_shared:
+            self._play_list = list(self._play_list)
+            self._play_list_shared = False
+
     # 播放歌曲
     async def play(self, name="", search_key="", exact=True, update_cur_list=False):
         self._last_cmd = "play"
@@ -2292,10 +2793,12 @@ class XiaoMusicDevice:
             if not exact:
                 if len(names) > 1:  # 大於一首歌才更新
                     self._play_list = names
+                    self._play_list_shared = False
                     self.device.cur_playlist = "臨時搜索列表"
                     self.update_playlist()
                 else:  # 只有一首歌，append
                     self._play_list = self._play_list + names
+                    self._play_list_shared = False
                     self.device.cur_playlist = "臨時搜索列表"
                     self.update_playlist(reorder=False)
             name = names[0]
@@ -2304,7 +2807,8 @@ class XiaoMusicDevice:
                 self.device.cur_playlist = self.find_cur_playlist(name)
                 self.update_playlist()
             self.log.debug(
-                f"當前播放列表為：{list2str(self._play_list, self.config.verbose)}"
+                "當前播放列表為：%s",
+                LazyList2Str(self._play_list, self.config.verbose),
             )
             # 本地存在歌曲，直接播放
             await self._playmusic(name)
@@ -2386,10 +2890,12 @@ class XiaoMusicDevice:
             if not exact:
                 if len(names) > 1:  # 大於一首歌才更新
                     self._play_list = names
+                    self._play_list_shared = False
                     self.device.cur_playlist = "臨時搜索列表"
                     self.update_playlist()
                 else:  # 只有一首歌，append
                     self._play_list = self._play_list + names
+                    self._play_list_shared = False
                     self.device.cur_playlist = "臨時搜索列表"
                     self.update_playlist(reorder=False)
             name = names[0]
@@ -2398,7 +2904,8 @@ class XiaoMusicDevice:
                 self.device.cur_playlist = self.find_cur_playlist(name)
                 self.update_playlist()
             self.log.debug(
-                f"當前播放列表為：{list2str(self._play_list, self.config.verbose)}"
+                "當前播放列表為：%s",
+                LazyList2Str(self._play_list, self.config.verbose),
             )
         elif not self.xiaomusic.is_music_exist(name):
             self.log.info(f"本地不存在歌曲{name}")
@@ -2470,11 +2977,15 @@ class XiaoMusicDevice:
 
     async def force_stop_xiaoai(self, device_id):
         try:
-            ret = await self.xiaomusic.mina_service.player_pause(device_id)
+            # 暫停和查詢播放狀態互不依賴，並發發出省一次網絡往返
+            ret, is_playing = await asyncio.gather(
+                self.xiaomusic.mina_service.player_pause(device_id),
+                self.get_if_xiaoai_is_playing(),
+            )
             self.log.info(
                 f"force_stop_xiaoai player_pause device_id:{device_id} ret:{ret}"
             )
-            await self.stop_if_xiaoai_is_playing(device_id)
+            await self.stop_if_xiaoai_is_playing(device_id, is_playing)
         except Exception as e:
             self.log.warning(f"Execption {e}")
 
@@ -2485,13 +2996,16 @@ class XiaoMusicDevice:
         self.log.info(playing_info)
         # WTF xiaomi api
         is_playing = (
-            json.loads(playing_info.get("data", {}).get("info", "{}")).get("status", -1)
+            _json_loads(playing_info.get("data", {}).get("info", "{}")).get(
+                "status", -1
+            )
             == 1
         )
         return is_playing
 
-    async def stop_if_xiaoai_is_playing(self, device_id):
-        is_playing = await self.get_if_xiaoai_is_playing()
+    async def stop_if_xiaoai_is_playing(self, device_id, is_playing=None):
+        if is_playing is None:
+            is_playing = await self.get_if_xiaoai_is_playing()
         if is_playing or self.config.enable_force_stop:
             # stop it
             ret = await self.xiaomusic.mina_service.player_stop(device_id)
@@ -2536,6 +3050,9 @@ class XiaoMusicDevice:
             "--ffmpeg-location",
             f"{self.ffmpeg_location}",
             "--no-playlist",
+            # 進度條沒人看，刷屏還白耗終端寫入
+            "--quiet",
+            "--no-progress",
         )
 
         if self.config.proxy:
@@ -2547,9 +3064,12 @@ class XiaoMusicDevice:
         if self.config.loudnorm:
             sbp_args += ("--postprocessor-args", f"-af {self.config.loudnorm}")
 
-        cmd = " ".join(sbp_args)
-        self.log.info(f"download cmd: {cmd}")
-        self._download_proc = await asyncio.create_subprocess_exec(*sbp_args)
+        self.log.info("download cmd: %s", sbp_args)
+        self._download_proc = await asyncio.create_subprocess_exec(
+            *sbp_args,
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.DEVNULL,
+        )
         await self.do_tts(f"正在下載歌曲{search_key}")
         self.log.info(f"正在下載中 {search_key} {name}")
         await self._download_proc.wait()
@@ -2577,15 +3097,21 @@ class XiaoMusicDevice:
     def isplaying(self):
         return self._playing
 
-    # 把下載的音樂加入播放列表
-    async def add_download_music(self, name):
-        filepath = os.path.join(self.download_path, f"{name}.mp3")
-        self.xiaomusic.all_music[name] = filepath
+    # 把下載的音樂加入播放列表，可一次傳多首，tag 只批量生成一輪
+    async def add_download_music(self, *names):
+        new_items = {
+            name: os.path.join(self.download_path, f"{name}.mp3") for name in names
+        }
+        self.xiaomusic.all_music.update(new_items)
+        self.xiaomusic._all_music_keys_cache = None
         # 應該很快，阻塞運行
-        await self.xiaomusic._gen_all_music_tag({name: filepath})
-        if name not in self._play_list:
-            self._play_list.append(name)
-            self.log.info(f"add_download_music add_music {name}")
+        await self.xiaomusic._gen_all_music_tag(new_items)
+        to_add = [name for name in names if name not in self._play_list]
+        if to_add:
+            self._ensure_play_list_private()
+            self._play_list.extend(to_add)
+            self._play_list_index = None
+            self.log.info(f"add_download_music add_music {to_add}")
             self.log.debug(self._play_list)
 
     def get_music(self, direction="next"):
@@ -2593,39 +3119,78 @@ class XiaoMusicDevice:
         if play_list_len == 0:
             self.log.warning("當前播放列表沒有歌曲")
             return ""
-        index = 0
-        try:
-            index = self._play_list.index(self.get_cur_music())
-        except ValueError:
-            pass
-
+        # 歌名 -> 下標的索引，列表變更後才重建，跳歌時免去整列表掃描
+        idx_map = self._play_list_index
+        if idx_map is None:
+            idx_map = {}
+            for i, music_name in enumerate(self._play_list):
+                # 同 list.index，重名時取第一個
+                idx_map.setdefault(music_name, i)
+            self._play_list_index = idx_map
+        index = idx_map.get(self.get_cur_music(), 0)
+
+        seq_end = direction == "next" and self.device.play_type == PLAY_TYPE_SEQ
         if play_list_len == 1:
             new_index = index  # 當只有一首歌曲時保持當前索引不變
         else:
-            if direction == "next":
-                new_index = index + 1
-                if (
-                    self.device.play_type == PLAY_TYPE_SEQ
-                    and new_index >= play_list_len
-                ):
-                    self.log.info("順序播放結束")
-                    return ""
-                if new_index >= play_list_len:
-                    new_index = 0
-            elif direction == "prev":
-                new_index = index - 1
-                if new_index < 0:
-                    new_index = play_list_len - 1
-            else:
+            index_fn = _NEXT_INDEX_FNS.get(direction)
+            if index_fn is None:
                 self.log.error("無效的方向參數")
                 return ""
+            new_index = index_fn(index, play_list_len, seq_end)
+            if new_index is None:
+                self.log.info("順序播放結束")
+                return ""
 
         name = self._play_list[new_index]
-        if not self.xiaomusic.is_music_exist(name):
-            self._play_list.pop(new_index)
-            self.log.info(f"pop not exist music: {name}")
-            return self.get_music(direction)
-        return name
+        if self.xiaomusic.is_music_exist(name):
+            return name
+
+        # 失效的歌曲先進墓碑集合，沿播放方向跳過它們繼續找，
+        # 找完一次性壓縮列表，連續缺失時不再反覆 pop 搬移元素
+        is_music_exist = self.xiaomusic.is_music_exist
+        dead = {name}
+        self.log.info(f"pop not exist music: {name}")
+        step = 1 if direction == "next" else -1
+        pos = new_index
+        found = ""
+        while True:
+            pos += step
+            if pos >= play_list_len:
+                if seq_end:
+                    if index == 0 and len(dead) == play_list_len - 1:
+                        # 後面的歌全失效了，只剩第一首，
+                        # 和只剩一首歌的分支一樣再試它自己
+                        candidate = self._play_list[0]
+                        if is_music_exist(candidate):
+                            found = candidate
+                        else:
+                            dead.add(candidate)
+                            self.log.info(f"pop not exist music: {candidate}")
+                    else:
+                        self.log.info("順序播放結束")
+                    break
+                pos = 0
+            elif pos < 0:
+                pos = play_list_len - 1
+            if pos == new_index:
+                break  # 繞回起點，整個列表都失效了
+            candidate = self._play_list[pos]
+            if candidate in dead:
+                continue
+            if is_music_exist(candidate):
+                found = candidate
+                break
+            dead.add(candidate)
+            self.log.info(f"pop not exist music: {candidate}")
+        self._play_list = [
+            music_name for music_name in self._play_list if music_name not in dead
+        ]
+        self._play_list_shared = False
+        self._play_list_index = None
+        if not self._play_list:
+            self.log.warning("當前播放列表沒有歌曲")
+        return found
 
     # 獲取下一首
     def get_next_music(self):
@@ -2637,19 +3202,20 @@ class XiaoMusicDevice:
 
     # 判斷是否播放下一首歌曲
     def check_play_next(self):
+        cur_music = self.get_cur_music()
         # 當前歌曲不在當前播放列表
-        if self.get_cur_music() not in self._play_list:
-            self.log.info(f"當前歌曲 {self.get_cur_music()} 不在當前播放列表")
+        if cur_music not in self._play_list:
+            self.log.info(f"當前歌曲 {cur_music} 不在當前播放列表")
             return True
 
         # 當前沒有在播放的歌曲
-        if self.get_cur_music() == "":
+        if cur_music == "":
             self.log.info("當前沒有在播放的歌曲")
             return True
         else:
             # 當前播放的歌曲不存在了
-            if not self.xiaomusic.is_music_exist(self.get_cur_music()):
-                self.log.info(f"當前播放的歌曲 {self.get_cur_music()} 不存在了")
+            if not self.xiaomusic.is_music_exist(cur_music):
+                self.log.info(f"當前播放的歌曲 {cur_music} 不存在了")
                 return True
         return False
 
@@ -2674,17 +3240,39 @@ class XiaoMusicDevice:
     # 同一組設備播放
     async def group_player_play(self, url, name=""):
         device_id_list = self.xiaomusic.get_group_device_id_list(self.group_name)
-        tasks = [
-            self.play_one_url(device_id, url, name) for device_id in device_id_list
-        ]
-        results = await asyncio.gather(*tasks)
-        self.log.info(f"group_player_play {url} {device_id_list} {results}")
-        return results
+        if not device_id_list:
+            self.log.info(f"group_player_play {url} {device_id_list} []")
+            return []
+        # 先讓發起指令的設備出聲，組內其餘設備後台下發，
+        # 開播的感知延遲不被組裡最慢的設備拖住
+        if self.device_id in device_id_list:
+            primary = self.device_id
+        else:
+            primary = device_id_list[0]
+        # audio_id 搜索一次全組共用，不用每台設備都查一遍
+        audio_id = await self._get_audio_id(name)
+        ret = await self.play_one_url(primary, url, name, audio_id)
+        rest = [device_id for device_id in device_id_list if device_id != primary]
+        if rest:
+
+            async def _play_rest():
+                results = await asyncio.gather(
+                    *[
+                        self.play_one_url(device_id, url, name, audio_id)
+                        for device_id in rest
+                    ]
+                )
+                self.log.info(f"group_player_play rest {url} {rest} {results}")
 
-    async def play_one_url(self, device_id, url, name):
+            self._group_rest_task = asyncio.create_task(_play_rest())
+        self.log.info(f"group_player_play {url} {device_id_list} {ret}")
+        return [ret]
+
+    async def play_one_url(self, device_id, url, name, audio_id=None):
         ret = None
         try:
-            audio_id = await self._get_audio_id(name)
+            if audio_id is None:
+                audio_id = await self._get_audio_id(name)
             if self.config.continue_play:
                 ret = await self.xiaomusic.mina_service.play_by_music_url(
                     device_id, url, _type=1, audio_id=audio_id
@@ -2714,6 +3302,18 @@ class XiaoMusicDevice:
         audio_id = self.config.use_music_audio_id or "1582971365183456177"
         if not (self.config.use_music_api or self.config.continue_play):
             return str(audio_id)
+        # 空名字和直鏈 URL 不是可搜索的歌名，直接用兜底 id
+        if not name or name.startswith(("http://", "https://")):
+            return str(audio_id)
+        # 同一首歌的搜索結果不會變，LRU 緩存住免得每次播放都請求一遍
+        cache = self.xiaomusic._audio_id_cache
+        cached = cache.get(name)
+        if cached is not None:
+            cache.move_to_end(name)
+            return cached
+        # 上次搜過但沒結果的名字也別再白跑一趟
+        if name in self.xiaomusic._audio_id_neg_cache:
+            return str(audio_id)
         try:
             params = {
                 "query": name,
@@ -2725,14 +3325,26 @@ class XiaoMusicDevice:
             response = await self.xiaomusic.mina_service.mina_request(
                 "/music/search", params
             )
-            for song in response["data"]["songList"]:
+            song_list = response["data"]["songList"]
+            if not song_list:
+                # 搜索空結果記進負緩存，網絡錯誤才留給下次重試
+                neg_cache = self.xiaomusic._audio_id_neg_cache
+                neg_cache[name] = True
+                if len(neg_cache) > 1024:
+                    neg_cache.popitem(last=False)
+                return str(audio_id)
+            for song in song_list:
                 if song["originName"] == "QQ音樂":
                     audio_id = song["audioID"]
                     break
             # 沒找到QQ音樂的歌曲，取第一個
             if audio_id == 1582971365183456177:
-                audio_id = response["data"]["songList"][0]["audioID"]
+                audio_id = song_list[0]["audioID"]
             self.log.debug(f"_get_audio_id. name: {name} songId:{audio_id}")
+            # 搜索成功才入緩存，失敗的兜底值下次還能重試
+            cache[name] = str(audio_id)
+            if len(cache) > 512:
+                cache.popitem(last=False)
         except Exception as e:
             self.log.error(f"_get_audio_id {e}")
         return str(audio_id)
@@ -2753,26 +3365,27 @@ class XiaoMusicDevice:
     # 設置下一首歌曲的播放定時器
     async def set_next_music_timeout(self, sec):
         self.cancel_next_timer()
+        # 純粹的等待用 call_later 掛一個定時器句柄就夠了，
+        # 不必為每首歌建一個睡眠中的 Task
+        loop = asyncio.get_running_loop()
+        self._next_timer = loop.call_later(sec, self._on_next_timer_fire)
+        self.log.info(f"{sec} 秒後將會播放下一首歌曲")
 
-        async def _do_next():
-            await asyncio.sleep(sec)
-            try:
-                self.log.info("定時器時間到了")
-                if self._next_timer:
-                    self._next_timer = None
-                    if self.device.play_type == PLAY_TYPE_SIN:
-                        self.log.info("單曲播放不繼續播放下一首")
-                        await self.stop(arg1="notts")
-                    else:
-                        await self._play_next()
-                else:
-                    self.log.info("定時器時間到了但是不見了")
-
-            except Exception as e:
-                self.log.error(f"Execption {e}")
+    # 定時器到點，把異步的切歌邏輯丟回事件循環
+    def _on_next_timer_fire(self):
+        self._next_timer = None
+        self._next_task = asyncio.create_task(self._next_music_timeout())
 
-        self._next_timer = asyncio.create_task(_do_next())
-        self.log.info(f"{sec} 秒後將會播放下一首歌曲")
+    async def _next_music_timeout(self):
+        try:
+            self.log.info("定時器時間到了")
+            if self.device.play_type == PLAY_TYPE_SIN:
+                self.log.info("單曲播放不繼續播放下一首")
+                await self.stop(arg1="notts")
+            else:
+                await self._play_next()
+        except Exception as e:
+            self.log.error(f"Execption {e}")
 
     async def set_volume(self, volume: int):
         self.log.info("set_volume. volume:%d", volume)
@@ -2788,7 +3401,7 @@ class XiaoMusicDevice:
                 self.device_id
             )
             self.log.info(f"get_volume. playing_info:{playing_info}")
-            volume = json.loads(playing_info.get("data", {}).get("info", "{}")).get(
+            volume = _json_loads(playing_info.get("data", {}).get("info", "{}")).get(
                 "volume", 0
             )
         except Exception as e:
@@ -2819,13 +3432,28 @@ class XiaoMusicDevice:
         self._playing = False
         if arg1 != "notts":
             await self.do_tts(self.config.stop_tts_msg)
-        await asyncio.sleep(3)  # 等它说完
+        await self._wait_tts_finish()  # 等它说完
         # 取消组内所有的下一首歌曲的定时器
-        await thdplay("stop", "", self.xiaomusic.thdtarget)
         self.cancel_group_next_timer()
-        await self.group_force_stop_xiaoai()
+        # 3 方播放器和小愛音箱的停止互不依賴，並發下發
+        await asyncio.gather(
+            thdplay("stop", "", self.xiaomusic.thdtarget),
+            self.group_force_stop_xiaoai(),
+        )
         self.log.info("stop now")
 
+    # 等音箱把話說完：輪詢播放狀態，回到空閒就立刻返回，
+    # 代替原來固定睡滿的等待，最多等 timeout 秒兜底
+    async def _wait_tts_finish(self, timeout=3):
+        deadline = time.time() + timeout
+        try:
+            while time.time() < deadline:
+                if not await self.get_if_xiaoai_is_playing():
+                    return
+                await asyncio.sleep(0.3)
+        except Exception as e:
+            self.log.warning(f"Execption {e}")
+
     async def group_force_stop_xiaoai(self):
         device_id_list = self.xiaomusic.get_group_device_id_list(self.group_name)
         self.log.info(f"group_force_stop_xiaoai {device_id_list}")
@@ -2858,6 +3486,22 @@ class XiaoMusicDevice:
             self._next_timer = None
         else:
             self.log.info("下一曲定時器不見了")
+        self._cancel_next_task()
+
+    # 定時器已觸發但切歌任務還在途時一併取消，
+    # 消除「剛停止卻又切了一首」的競態；自己取消自己要跳過
+    def _cancel_next_task(self):
+        task = self._next_task
+        if task is None or task.done():
+            return
+        try:
+            running = asyncio.current_task()
+        except RuntimeError:
+            running = None
+        if task is not running:
+            task.cancel()
+            self._next_task = None
+            self.log.info(f"在途切歌任務已取消 {self.device_id}")
 
     def cancel_group_next_timer(self):
         devices = self.xiaomusic.get_group_devices(self.group_name)
@@ -2875,18 +3519,13 @@ class XiaoMusicDevice:
             self._next_timer.cancel()
             self._next_timer = None
             self.log.info("cancel_all_timer _next_timer.cancel")
+        self._cancel_next_task()
 
         if self._stop_timer:
             self._stop_timer.cancel()
             self._stop_timer = None
             self.log.info("cancel_all_timer _stop_timer.cancel")
 
-    @classmethod
-    def dict_clear(cls, d):
-        for key in list(d):
-            val = d.pop(key)
-            val.cancel_all_timer()
-
     # 根據當前歌曲匹配歌曲列表
     def find_cur_playlist(self, name):
         # 匹配順序：
@@ -2896,20 +3535,7 @@ class XiaoMusicDevice:
         # 4. 所有歌曲
         # 5. 所有電台
         # 6. 全部
-        if name in self.xiaomusic.music_list.get("收藏", []):
-            return "收藏"
-        if name in self.xiaomusic.music_list.get("最近新增", []):
-            return "最近新增"
-        for list_name, play_list in self.xiaomusic.music_list.items():
-            if (list_name not in ["全部", "所有歌曲", "所有電台", "臨時搜索列表"]) and (
-                name in play_list
-            ):
-                return list_name
-        if name in self.xiaomusic.music_list.get("所有歌曲", []):
-            return "所有歌曲"
-        if name in self.xiaomusic.music_list.get("所有電台", []):
-            return "所有電台"
-        return "全部"
+        return self.xiaomusic.find_cur_playlist(name)
 
 
 # 目錄監控類，使用延遲防抖，僅監控音樂文件
@@ -2919,6 +3545,13 @@ class XiaoMusicPathWatch(FileSystemEventHandler):
         self.debounce_delay = debounce_delay
         self.loop = loop
         self._debounce_handle = None
+        self._pending_events = []  # 防抖窗口內收集的 (op, src, dest) 事件
+        # 批量拷貝時每個文件都會觸發事件，後綴判斷走 endswith 免分配；
+        # 常見的全小寫/全大寫後綴直接命中，混合大小寫才退回 lower()
+        self._suffixes = tuple(SUPPORT_MUSIC_TYPE) + tuple(
+            ext.upper() for ext in SUPPORT_MUSIC_TYPE
+        )
+        self._suffixes_lower = tuple(SUPPORT_MUSIC_TYPE)
 
     def on_any_event(self, event):
         # 只處理文件的創建、刪除和移動事件
@@ -2928,22 +3561,41 @@ class XiaoMusicPathWatch(FileSystemEventHandler):
         if event.is_directory:
             return  # 忽略目錄事件
 
+        if isinstance(event, FileMovedEvent):
+            op = "moved"
+        elif isinstance(event, FileDeletedEvent):
+            op = "deleted"
+        else:
+            op = "created"
+
         # 處理文件事件
-        src_ext = os.path.splitext(event.src_path)[1].lower()
         # 處理移動事件的目標路徑
-        if hasattr(event, "dest_path"):
-            dest_ext = os.path.splitext(event.dest_path)[1].lower()
-            if dest_ext in SUPPORT_MUSIC_TYPE:
-                self.schedule_callback()
-                return
+        dest_path = getattr(event, "dest_path", None)
+        if dest_path is not None and self._is_music_path(dest_path):
+            self._schedule_threadsafe((op, event.src_path, dest_path))
+            return
+
+        if self._is_music_path(event.src_path):
+            self._schedule_threadsafe((op, event.src_path, dest_path))
+
+    def _is_music_path(self, path):
+        return path.endswith(self._suffixes) or path.lower().endswith(
+            self._suffixes_lower
+        )
+
+    def _schedule_threadsafe(self, evt):
+        # watchdog 回調在自己的線程裡執行，跨線程調度必須走 call_soon_threadsafe，
+        # 防抖後 cp -r 之類的批量事件只觸發一次重掃
+        self.loop.call_soon_threadsafe(self.schedule_callback, evt)
 
-        if src_ext in SUPPORT_MUSIC_TYPE:
-            self.schedule_callback()
+    def schedule_callback(self, evt):
+        self._pending_events.append(evt)
 
-    def schedule_callback(self):
         def _execute_callback():
             self._debounce_handle = None
-            self.callback()
+            events = self._pending_events
+            self._pending_events = []
+            self.callback(events)
 
         if self._debounce_handle:
             self._debounce_handle.cancel()